@@ -5,3 +5,7 @@ class ApiConfig(AppConfig):
     """Класс конфигурации для приложения 'api'."""
 
     name = 'api'
+
+    def ready(self):
+        """Подключение обработчиков сигналов и проверок приложения."""
+        from . import checks, signals  # noqa: F401
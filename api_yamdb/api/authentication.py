@@ -0,0 +1,208 @@
+import time
+from collections import OrderedDict
+from copy import copy
+from threading import Lock
+from typing import Hashable, Iterable, Optional
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .cache import get_cache
+from users.models import User
+
+USER_VERSION_KEY_PREFIX: str = 'user-version'
+TOKEN_VERSION_KEY_PREFIX: str = 'user-token-version'
+TOKEN_VERSION_CLAIM: str = 'token_version'
+
+
+class LRUCache:
+    """Ограниченный по размеру кэш процесса с временем жизни записей."""
+
+    def __init__(self, max_size: int, timeout: float) -> None:
+        self.max_size: int = max_size
+        self.timeout: float = timeout
+        self.items: OrderedDict = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key: Hashable):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value) -> None:
+        with self.lock:
+            self.items[key] = (time.monotonic() + self.timeout, value)
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.items.clear()
+
+
+user_cache = LRUCache(
+    settings.USER_CACHE_MAX_SIZE,
+    settings.USER_CACHE_TIMEOUT,
+)
+
+
+def get_user_version_key(user_id) -> str:
+    """Ключ версии данных пользователя в общем кэше."""
+    return f'{USER_VERSION_KEY_PREFIX}:{user_id}'
+
+
+def get_user_version(user_id) -> int:
+    """Текущая версия данных пользователя.
+
+    Новая версия создается из текущего времени, поэтому после удаления
+    ключа (инвалидации или вытеснения из кэша) она не совпадет
+    ни с одной из прежних.
+    """
+    cache = get_cache()
+    key: str = get_user_version_key(user_id)
+    version: Optional[int] = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_token_version_key(user_id) -> str:
+    """Ключ актуальной версии токенов пользователя в общем кэше."""
+    return f'{TOKEN_VERSION_KEY_PREFIX}:{user_id}'
+
+
+def get_token_version(user_id) -> Optional[int]:
+    """Актуальная версия токенов активного пользователя.
+
+    Значение читается из общего кэша, а при его отсутствии - из базы
+    данных. Для удаленного или неактивного пользователя возвращает None.
+    Значение хранится в кэше TOKEN_VERSION_CACHE_TIMEOUT секунд: если
+    кэш не общий для процессов, сброс в одном процессе не дойдет до
+    остальных, и время жизни ограничивает срок действия отозванных прав.
+    """
+    cache = get_cache()
+    key: str = get_token_version_key(user_id)
+    version: Optional[int] = cache.get(key)
+    if version is None:
+        version = User.objects.filter(
+            pk=user_id, is_active=True
+        ).values_list('token_version', flat=True).first()
+        if version is not None:
+            cache.add(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def invalidate_users(user_ids: Iterable) -> None:
+    """Сбрасывает закэшированные во всех процессах данные пользователей."""
+    get_cache().delete_many([
+        key
+        for user_id in user_ids
+        for key in (
+            get_user_version_key(user_id),
+            get_token_version_key(user_id),
+        )
+    ])
+
+
+def invalidate_user(user_id) -> None:
+    """Сбрасывает закэшированные во всех процессах данные пользователя."""
+    invalidate_users((user_id, ))
+
+
+def get_access_token(user: User) -> AccessToken:
+    """Access-токен с ролью, флагами и версией токенов пользователя."""
+    token = AccessToken.for_user(user)
+    for claim, value in user.get_token_claims().items():
+        token[claim] = value
+    return token
+
+
+class TokenClaimsUser(SimpleLazyObject):
+    """Пользователь запроса, права которого берутся из токена.
+
+    Проверки прав (`is_admin`, `is_moderator`, `is_authenticated`)
+    не обращаются к базе данных; при обращении к остальным атрибутам
+    объект пользователя загружается функцией loader.
+    """
+
+    UserRoles = User.UserRoles
+    is_admin = User.is_admin
+    is_moderator = User.is_moderator
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token, loader) -> None:
+        super().__init__(loader)
+        self.__dict__['token'] = token
+
+    @property
+    def id(self):
+        return self.token[api_settings.USER_ID_CLAIM]
+
+    pk = id
+
+    @property
+    def role(self) -> str:
+        return self.token['role']
+
+    @property
+    def is_staff(self) -> bool:
+        return self.token['is_staff']
+
+    @property
+    def is_superuser(self) -> bool:
+        return self.token['is_superuser']
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация с кэшированием пользователей.
+
+    Пользователь хранится в LRU-кэше процесса по ключу (id, версия);
+    версия берется из общего кэша и меняется при изменении или удалении
+    пользователя, поэтому запрос обходится без обращения к таблице
+    пользователей. Для токенов с утверждениями о правах (см.
+    `get_access_token`) возвращается `TokenClaimsUser`, а токен
+    с устаревшей версией отклоняется.
+    """
+
+    def get_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return self.get_cached_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        version: Optional[int] = get_token_version(user_id)
+        if version is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+        if validated_token[TOKEN_VERSION_CLAIM] != version:
+            raise AuthenticationFailed(
+                'Права пользователя изменились, получите новый токен.',
+                code='token_stale',
+            )
+        return TokenClaimsUser(
+            validated_token, lambda: self.get_cached_user(validated_token)
+        )
+
+    def get_cached_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        key = (user_id, get_user_version(user_id))
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+        return copy(user)
@@ -0,0 +1,242 @@
+import json
+import math
+import time
+from contextlib import ExitStack
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connections
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from .authentication import get_access_token
+from .cache import get_cache
+from .middleware import QueryCounter
+from reviews.models import Category, Genre, Review, Title
+from users.models import User
+
+BENCHMARK_USERNAME: str = 'benchmark_admin'
+BULK_TITLES: int = 10
+
+
+class Scenario(NamedTuple):
+    """Запрос, время выполнения которого измеряется."""
+
+    name: str
+    method: str
+    path: str
+    payload: Optional[object] = None
+    auth: bool = False
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Процентиль отсортированного списка по методу ближайшего ранга."""
+    if not values:
+        return 0.0
+    rank: int = math.ceil(percent / 100 * len(values))
+    return values[max(rank, 1) - 1]
+
+
+def get_benchmark_user() -> User:
+    user, _ = User.objects.get_or_create(
+        username=BENCHMARK_USERNAME,
+        defaults={
+            'email': f'{BENCHMARK_USERNAME}@example.com',
+            'role': User.UserRoles.ADMIN,
+        },
+    )
+    return user
+
+
+def build_scenarios(user: User) -> List[Scenario]:
+    """Запросы ко всем маршрутам api/urls.py на текущих данных.
+
+    Для вложенных маршрутов берутся самое популярное произведение и самый
+    обсуждаемый отзыв к нему. Маршруты категорий и жанров по slug
+    поддерживают только DELETE и не измеряются, как и маршрут comments/
+    без идентификатора отзыва. Изменяющие данные запросы идут последними,
+    чтобы не влиять на остальные измерения.
+    """
+    title: Title = Title.objects.order_by('-reviews_count', 'pk').first()
+    review: Review = Review.objects.filter(title=title).annotate(
+        comments_total=Count('comments')
+    ).order_by('-comments_total', 'pk').first()
+    comment = review.comments.order_by('pk').first()
+    category: Category = Category.objects.order_by('pk').first()
+    genre: Genre = Genre.objects.order_by('pk').first()
+    reviews_path: str = reverse('reviews-list', args=(title.pk, ))
+    comments_path: str = reverse(
+        'comments-list', args=(title.pk, review.pk)
+    )
+    return [
+        Scenario('titles-list', 'get', reverse('titles-list')),
+        Scenario(
+            'titles-list-cursor', 'get',
+            f'{reverse("titles-list")}?pagination=cursor',
+        ),
+        Scenario(
+            'titles-list-filter', 'get',
+            f'{reverse("titles-list")}?category={category.slug}'
+            f'&genre={genre.slug}',
+        ),
+        Scenario(
+            'titles-search', 'get',
+            f'{reverse("titles-list")}?search={title.name.split()[0]}',
+        ),
+        Scenario('titles-detail', 'get', reverse(
+            'titles-detail', args=(title.pk, )
+        )),
+        Scenario('reviews-list', 'get', reviews_path),
+        Scenario(
+            'reviews-list-cursor', 'get', f'{reviews_path}?pagination=cursor'
+        ),
+        Scenario('reviews-detail', 'get', reverse(
+            'reviews-detail', args=(title.pk, review.pk)
+        )),
+        Scenario('comments-list', 'get', comments_path),
+        Scenario('comments-detail', 'get', reverse(
+            'comments-detail', args=(title.pk, review.pk, comment.pk)
+        )),
+        Scenario('categories-list', 'get', reverse('categories-list')),
+        Scenario('genres-list', 'get', reverse('genres-list')),
+        Scenario('user-list', 'get', reverse('user-list'), auth=True),
+        Scenario('user-detail', 'get', reverse(
+            'user-detail', args=(user.username, )
+        ), auth=True),
+        Scenario('user_profile', 'get', reverse('user_profile'), auth=True),
+        Scenario('export_data', 'get', reverse(
+            'export_data', args=('comments', )
+        ), auth=True),
+        Scenario('metrics', 'get', reverse('metrics'), auth=True),
+        Scenario('signup', 'post', reverse('signup'), {
+            'username': user.username, 'email': user.email,
+        }),
+        Scenario('get_jwt_token', 'post', reverse('get_jwt_token'), {
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        }),
+        Scenario('titles-bulk', 'post', reverse('titles-bulk'), [
+            {
+                'name': f'Benchmark {number}',
+                'year': 2000,
+                'description': 'Benchmark',
+                'category': category.slug,
+                'genre': [genre.slug],
+            }
+            for number in range(BULK_TITLES)
+        ], auth=True),
+    ]
+
+
+def send(client: Client, scenario: Scenario, headers: Dict[str, str]):
+    """Выполняет запрос и дочитывает потоковый ответ."""
+    response = getattr(client, scenario.method)(
+        scenario.path,
+        data=json.dumps(scenario.payload) if scenario.payload else None,
+        content_type='application/json',
+        **(headers if scenario.auth else {}),
+    )
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def measure(
+    client: Client,
+    scenario: Scenario,
+    headers: Dict[str, str],
+    iterations: int,
+    warmup: int,
+) -> Dict[str, object]:
+    """Задержки, пропускная способность и число SQL-запросов сценария.
+
+    Перед каждым запросом общий кэш очищается (вне измеряемого времени):
+    иначе после прогрева списки измеряли бы попадания в кэш ответов,
+    а не запросы к базе данных, и регрессия в них не была бы видна.
+    """
+    cache = get_cache()
+    for _ in range(warmup):
+        cache.clear()
+        send(client, scenario, headers)
+    timings: List[float] = []
+    statuses: Dict[str, int] = {}
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        for _ in range(iterations):
+            cache.clear()
+            request_started: float = time.perf_counter()
+            response = send(client, scenario, headers)
+            timings.append(time.perf_counter() - request_started)
+            code: str = str(response.status_code)
+            statuses[code] = statuses.get(code, 0) + 1
+    elapsed: float = sum(timings)
+    timings.sort()
+    return {
+        'method': scenario.method.upper(),
+        'path': scenario.path,
+        'iterations': iterations,
+        'statuses': statuses,
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'mean_ms': round(sum(timings) / iterations * 1000, 3),
+        'throughput_rps': round(iterations / elapsed, 1),
+        'queries_per_request': round(counter.count / iterations, 2),
+    }
+
+
+def run_benchmark(iterations: int, warmup: int) -> Dict[str, Dict]:
+    """Прогоняет все сценарии через тестовый клиент Django.
+
+    Ограничения частоты запросов отключаются: иначе повторяющиеся
+    запросы к эндпоинтам аутентификации измеряли бы ответы 429. Окно
+    повторной регистрации тоже отключается, чтобы каждый запрос signup
+    создавал и ставил в очередь код подтверждения.
+    """
+    user: User = get_benchmark_user()
+    token: str = str(get_access_token(user))
+    headers: Dict[str, str] = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+    client = Client()
+    rest_framework = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+    with override_settings(
+        REST_FRAMEWORK=rest_framework, SIGNUP_RESEND_WINDOW=0
+    ):
+        return {
+            scenario.name: measure(
+                client, scenario, headers, iterations, warmup
+            )
+            for scenario in build_scenarios(user)
+        }
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    threshold: float,
+) -> List[Tuple[str, str, float, float]]:
+    """Регрессии относительно базового прогона.
+
+    Регрессией считается рост p95 больше чем на threshold процентов
+    или любое увеличение числа SQL-запросов на запрос.
+    """
+    regressions: List[Tuple[str, str, float, float]] = []
+    for name, result in results.items():
+        old: Optional[Dict] = baseline.get(name)
+        if old is None:
+            continue
+        if result['p95_ms'] > old['p95_ms'] * (1 + threshold / 100):
+            regressions.append(
+                (name, 'p95_ms', old['p95_ms'], result['p95_ms'])
+            )
+        if result['queries_per_request'] > old['queries_per_request']:
+            regressions.append((
+                name,
+                'queries_per_request',
+                old['queries_per_request'],
+                result['queries_per_request'],
+            ))
+    return regressions
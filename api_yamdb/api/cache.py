@@ -0,0 +1,122 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Model
+from rest_framework.response import Response
+
+VERSION_KEY_PREFIX: str = 'model-version'
+RESPONSE_KEY_PREFIX: str = 'response'
+
+
+def get_cache():
+    """Кэш, общий для всех процессов приложения."""
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def get_version_key(model) -> str:
+    """Ключ счетчика версий модели."""
+    return f'{VERSION_KEY_PREFIX}:{model._meta.label_lower}'
+
+
+def get_model_versions(models: Iterable[Model]) -> Dict[str, int]:
+    """Текущие версии данных моделей.
+
+    Версия - время последнего изменения модели в наносекундах. Если
+    версии нет в кэше (модель не менялась с запуска или ключ вытеснен),
+    она создается из текущего времени: так новая версия не совпадет
+    с прежними, а дата изменения не окажется раньше настоящей.
+    """
+    cache = get_cache()
+    keys = [get_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now: int = time.time_ns()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        versions.update(cache.get_many(missing))
+    return {key: versions.get(key, 0) for key in keys}
+
+
+def get_versions_modified(
+    versions: Dict[str, int],
+) -> Optional[datetime]:
+    """Дата изменения данных по версиям моделей."""
+    if not versions:
+        return None
+    return datetime.fromtimestamp(
+        max(versions.values()) / 1e9, tz=timezone.utc
+    )
+
+
+def increment_counter(key: str, delta: int = 1) -> bool:
+    """Увеличивает бессрочный счетчик в кэше.
+
+    Возвращает True, если счетчик был создан этим вызовом.
+    """
+    cache = get_cache()
+    if cache.add(key, delta, timeout=None):
+        return True
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.set(key, delta, timeout=None)
+    return False
+
+
+def set_version(key: str) -> None:
+    """Записывает текущее время как новую версию данных.
+
+    Версия не уменьшается, даже если часы отстали от предыдущей версии.
+    """
+    cache = get_cache()
+    current: int = cache.get(key, 0)
+    cache.set(key, max(time.time_ns(), current + 1), timeout=None)
+
+
+def bump_model_version(model) -> None:
+    """Обновляет версию данных модели, инвалидируя зависимые ответы.
+
+    Версия меняется после фиксации текущей транзакции: иначе конкурентный
+    запрос мог бы закэшировать данные до изменения под новой версией.
+    """
+    key: str = get_version_key(model)
+    transaction.on_commit(lambda: set_version(key))
+
+
+class VersionedCacheMixin:
+    """Кэширование ответов на запросы списка объектов.
+
+    Ключ ответа включает схему, хост, путь, строку запроса и версии
+    моделей из `cache_dependencies`; версии меняются при любом
+    изменении этих моделей, поэтому устаревшие ответы больше не
+    запрашиваются. Схема и хост нужны потому, что ссылки `next` и
+    `previous` в ответе абсолютные.
+    """
+
+    cache_dependencies = ()
+
+    def get_response_cache_key(self, request) -> str:
+        versions = get_model_versions(self.cache_dependencies)
+        raw_key: str = '|'.join((
+            request.build_absolute_uri(request.path),
+            request.META.get('QUERY_STRING', ''),
+            *(f'{key}={value}' for key, value in sorted(versions.items())),
+        ))
+        digest: str = hashlib.md5(raw_key.encode()).hexdigest()
+        return f'{RESPONSE_KEY_PREFIX}:{digest}'
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        key: str = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
@@ -0,0 +1,32 @@
+from typing import List
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs) -> List[Error]:
+    """Проверяет, что в профиле production кэш общий для процессов.
+
+    В кэше хранятся версии токенов и данных пользователей: в кэше
+    отдельного процесса сброс версии не доходит до остальных процессов,
+    поэтому такой кэш в production считается ошибкой конфигурации.
+    """
+    if settings.DATABASE_PROFILE != 'production':
+        return []
+    backend: str = settings.CACHES[settings.RESPONSE_CACHE_ALIAS]['BACKEND']
+    if backend not in settings.LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        Error(
+            f'Кэш {settings.RESPONSE_CACHE_ALIAS!r} ({backend}) не общий '
+            'для процессов приложения.',
+            hint=(
+                'Используйте FileBasedCache (по умолчанию в профиле '
+                'production), Redis или Memcached: иначе смена прав '
+                'пользователя доходит до других процессов только через '
+                'TOKEN_VERSION_CACHE_TIMEOUT секунд.'
+            ),
+            id='api.E001',
+        ),
+    ]
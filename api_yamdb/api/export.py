@@ -0,0 +1,88 @@
+import json
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import Comment, Review, Title
+
+
+def iter_chunks(rows: Iterable, size: int) -> Iterator[List]:
+    """Разбивает поток строк на списки длиной не больше size."""
+    iterator = iter(rows)
+    chunk: List = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def export_titles(chunk_size: int) -> Iterator[Dict]:
+    """Произведения со слагами категории и жанров."""
+    rows = Title.objects.order_by('pk').values(
+        'id',
+        'name',
+        'year',
+        'description',
+        'rating',
+        'reviews_count',
+        'category__slug',
+    ).iterator(chunk_size=chunk_size)
+    through = Title.genre.through.objects
+    for chunk in iter_chunks(rows, chunk_size):
+        genres: Dict[int, List[str]] = {}
+        for title_id, slug in through.filter(
+            title_id__in=[row['id'] for row in chunk]
+        ).order_by('genre__slug').values_list('title_id', 'genre__slug'):
+            genres.setdefault(title_id, []).append(slug)
+        for row in chunk:
+            row['category'] = row.pop('category__slug')
+            row['genre'] = genres.get(row['id'], [])
+            yield row
+
+
+def export_reviews(chunk_size: int) -> Iterator[Dict]:
+    """Отзывы с именами авторов."""
+    rows = Review.objects.order_by('pk').values(
+        'id',
+        'title_id',
+        'author__username',
+        'text',
+        'score',
+        'pub_date',
+    ).iterator(chunk_size=chunk_size)
+    for row in rows:
+        row['author'] = row.pop('author__username')
+        yield row
+
+
+def export_comments(chunk_size: int) -> Iterator[Dict]:
+    """Комментарии с именами авторов."""
+    rows = Comment.objects.order_by('pk').values(
+        'id',
+        'review_id',
+        'author__username',
+        'text',
+        'pub_date',
+    ).iterator(chunk_size=chunk_size)
+    for row in rows:
+        row['author'] = row.pop('author__username')
+        yield row
+
+
+EXPORTERS: Dict[str, Callable[[int], Iterator[Dict]]] = {
+    'titles': export_titles,
+    'reviews': export_reviews,
+    'comments': export_comments,
+}
+
+
+def stream_ndjson(dataset: str) -> Iterator[str]:
+    """Строки NDJSON выгрузки, сгруппированные в пакеты."""
+    chunk_size: int = settings.EXPORT_CHUNK_SIZE
+    rows = EXPORTERS[dataset](chunk_size)
+    for chunk in iter_chunks(rows, chunk_size):
+        yield ''.join(
+            json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+            for row in chunk
+        )
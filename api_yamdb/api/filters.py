@@ -1,4 +1,6 @@
+from django.db.models import Q
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 
 from reviews.models import Title
 
@@ -10,7 +12,39 @@ class TitleFilter(filters.FilterSet):
     year = filters.NumberFilter(field_name='year')
     genre = filters.CharFilter(field_name='genre__slug')
     category = filters.CharFilter(field_name='category__slug')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'category', 'genre')
+        fields = ('name', 'year', 'category', 'genre', 'search')
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию произведения."""
+        return queryset.search(value)
+
+
+class PrefixSearchFilter(SearchFilter):
+    """Поиск по началу нормализованных (casefold) индексируемых полей.
+
+    Префикс ищется диапазоном `>= prefix AND < prefix + U+10FFFF`,
+    поэтому запрос использует индекс поля, а регистр кириллицы
+    учитывается так же, как и латиницы.
+    """
+
+    MAX_CHAR: str = chr(0x10FFFF)
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        prefix: str = request.query_params.get(
+            self.search_param, ''
+        ).strip().casefold()
+        if not search_fields or not prefix:
+            return queryset
+
+        conditions = Q()
+        for field in search_fields:
+            conditions |= Q(**{
+                f'{field}__gte': prefix,
+                f'{field}__lt': prefix + self.MAX_CHAR,
+            })
+        return queryset.filter(conditions)
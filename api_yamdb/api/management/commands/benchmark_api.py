@@ -0,0 +1,135 @@
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from io import StringIO
+from typing import Dict
+
+import django
+from django.core.management import BaseCommand, call_command
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from api.benchmark import compare, run_benchmark
+
+SIZE_OPTIONS = {
+    'users': 1000,
+    'categories': 10,
+    'genres': 20,
+    'titles': 1000,
+    'reviews': 10000,
+    'comments': 20000,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет временную базу данных синтетическими данными и измеряет '
+        'задержки, пропускную способность и число SQL-запросов маршрутов API.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in SIZE_OPTIONS.items():
+            parser.add_argument(f'--{name}', type=int, default=default)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Количество измеряемых запросов на каждый маршрут.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=10,
+            help='Количество запросов для прогрева перед измерением.',
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark.json',
+            help='Файл для сохранения результатов в формате JSON.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON-файл предыдущего прогона для сравнения.',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=20.0,
+            help='Допустимый рост p95 относительно базового прогона, %%.',
+        )
+
+    def run_on_test_database(self, options) -> Dict[str, Dict]:
+        """Создает тестовую базу данных, заполняет ее и прогоняет замеры.
+
+        Рабочая база данных не затрагивается.
+        """
+        setup_test_environment()
+        old_name: str = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            call_command(
+                'generate_data',
+                seed=options['seed'],
+                stdout=StringIO(),
+                **{name: options[name] for name in SIZE_OPTIONS},
+            )
+            return run_benchmark(options['iterations'], options['warmup'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def report(self, results: Dict[str, Dict]) -> None:
+        self.stdout.write(
+            f'{"маршрут":<22}{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+            f'{"запр./с":>10}{"SQL":>7}  статусы'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<22}{result["p50_ms"]:>10}{result["p95_ms"]:>10}'
+                f'{result["p99_ms"]:>10}{result["throughput_rps"]:>10}'
+                f'{result["queries_per_request"]:>7}  {result["statuses"]}'
+            )
+
+    def check_baseline(self, results: Dict[str, Dict], options) -> None:
+        with open(options['baseline'], encoding='utf-8') as baseline_file:
+            baseline: Dict = json.load(baseline_file)['results']
+        regressions = compare(results, baseline, options['threshold'])
+        for name, metric, old, new in regressions:
+            self.stdout.write(
+                self.style.ERROR(f'{name}: {metric} {old} -> {new}')
+            )
+        if regressions:
+            sys.exit(1)
+        self.stdout.write(
+            self.style.SUCCESS('Регрессий относительно базового прогона нет.')
+        )
+
+    def handle(self, *args, **options):
+        results: Dict[str, Dict] = self.run_on_test_database(options)
+        self.report(results)
+        meta: Dict[str, object] = {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'seed': options['seed'],
+            'iterations': options['iterations'],
+            'warmup': options['warmup'],
+            'sizes': {name: options[name] for name in SIZE_OPTIONS},
+        }
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(
+                {'meta': meta, 'results': results},
+                output,
+                ensure_ascii=False,
+                indent=2,
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Результаты сохранены в {options["output"]}')
+        )
+        if options['baseline']:
+            self.check_baseline(results, options)
@@ -0,0 +1,40 @@
+from typing import Dict, Iterable, Set
+
+from .cache import get_cache, increment_counter
+
+METRIC_KEY_PREFIX: str = 'metric'
+
+# Названия метрик, известные процессу. Метрики регистрируются при импорте
+# кода, который их увеличивает (декораторы, подклассы), поэтому список
+# одинаков во всех процессах и не хранится в кэше.
+known_metrics: Set[str] = set()
+
+
+def get_metric_key(name: str) -> str:
+    """Ключ счетчика метрики."""
+    return f'{METRIC_KEY_PREFIX}:{name}'
+
+
+def register_metrics(names: Iterable[str]) -> None:
+    """Добавляет метрики в отчет get_metrics."""
+    known_metrics.update(names)
+
+
+def increment_metric(name: str, delta: int = 1) -> None:
+    """Увеличивает счетчик метрики.
+
+    Счетчик увеличивается атомарно; название только добавляется
+    в известные процессу метрики, без чтения и записи общего списка.
+    """
+    known_metrics.add(name)
+    increment_counter(get_metric_key(name), delta)
+
+
+def get_metrics() -> Dict[str, int]:
+    """Текущие значения известных метрик, счетчики которых есть в кэше."""
+    names = sorted(known_metrics)
+    values = get_cache().get_many([get_metric_key(name) for name in names])
+    return {
+        name: values[get_metric_key(name)]
+        for name in names if get_metric_key(name) in values
+    }
@@ -0,0 +1,100 @@
+import logging
+import time
+from contextlib import ExitStack
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """Обертка выполнения SQL-запросов, подсчитывающая их число и время."""
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.duration: float = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start: float = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def get_query_budget(url_name: Optional[str]) -> Optional[int]:
+    """Допустимое число SQL-запросов для представления по имени url."""
+    return settings.QUERY_BUDGETS.get(
+        url_name,
+        settings.QUERY_BUDGET_DEFAULT,
+    )
+
+
+class QueryBudgetMiddleware:
+    """Подсчет SQL-запросов, выполненных при обработке запроса.
+
+    Число запросов и их суммарное время передаются в заголовке
+    `Server-Timing`, превышение бюджета представления логируется.
+    Для потоковых ответов подсчет продолжается, пока формируется тело
+    ответа, и бюджет проверяется после его отправки; заголовок
+    `Server-Timing` в этом случае не добавляется, так как заголовки
+    уходят клиенту раньше.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def count_queries(counter: QueryCounter) -> ExitStack:
+        """Контекст подсчета запросов ко всем базам данных."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        return stack
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with self.count_queries(counter):
+            response = self.get_response(request)
+
+        if response.streaming:
+            response.streaming_content = self.count_streaming_queries(
+                request, response.streaming_content, counter
+            )
+            return response
+
+        response['Server-Timing'] = (
+            f'db;dur={counter.duration * 1000:.3f};'
+            f'desc="{counter.count} queries"'
+        )
+        self.check_budget(request, counter)
+        return response
+
+    def count_streaming_queries(
+        self,
+        request,
+        content: Iterable[bytes],
+        counter: QueryCounter,
+    ) -> Iterator[bytes]:
+        """Тело потокового ответа с подсчетом запросов при его генерации."""
+        with self.count_queries(counter):
+            yield from content
+        self.check_budget(request, counter)
+
+    def check_budget(self, request, counter: QueryCounter) -> None:
+        """Логирует превышение бюджета SQL-запросов представления."""
+        match = request.resolver_match
+        url_name: Optional[str] = match.url_name if match else None
+        budget: Optional[int] = get_query_budget(url_name)
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                'Превышен бюджет SQL-запросов для %s %s (%s): %d > %d',
+                request.method,
+                request.path,
+                url_name,
+                counter.count,
+                budget,
+            )
@@ -1,5 +1,12 @@
+from datetime import datetime
+from typing import Optional, Tuple
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import mixins, viewsets
 
+from .retry import call_with_retry, register_retry_metrics
+
 
 class CLDViewSet(mixins.CreateModelMixin,
                  mixins.ListModelMixin,
@@ -8,3 +15,114 @@ class CLDViewSet(mixins.CreateModelMixin,
     """Вьюсет, исключающий использование методов create, update."""
 
     pass
+
+
+class CursorPaginationMixin:
+    """Переключение вьюсета на курсорную пагинацию.
+
+    Курсорная пагинация включается параметром запроса `pagination=cursor`
+    (либо наличием параметра `cursor`), иначе используется пагинация
+    из настроек проекта.
+    """
+
+    cursor_pagination_class = None
+    pagination_query_param: str = 'pagination'
+    cursor_query_param: str = 'cursor'
+
+    def use_cursor_pagination(self) -> bool:
+        """Запрошена ли курсорная пагинация."""
+        query_params = self.request.query_params
+        return (
+            query_params.get(self.pagination_query_param) == 'cursor'
+            or self.cursor_query_param in query_params
+        )
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, '_paginator')
+            and self.cursor_pagination_class is not None
+            and self.use_cursor_pagination()
+        ):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+
+class ConditionalGetMixin:
+    """Условные GET-запросы с валидаторами ETag и Last-Modified.
+
+    Валидаторы вычисляются методом `get_conditional_validators` до
+    сериализации, поэтому при совпадении `If-None-Match` или
+    `If-Modified-Since` ответ 304 отдается без обращения к сериализатору.
+    """
+
+    def get_conditional_validators(
+        self,
+    ) -> Tuple[Optional[str], Optional[datetime]]:
+        """ETag и дата изменения ресурса для текущего действия."""
+        return None, None
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_conditional_validators()
+        if etag is None and last_modified is None:
+            return handler(request, *args, **kwargs)
+
+        etag = quote_etag(etag) if etag else None
+        timestamp: Optional[int] = (
+            int(last_modified.timestamp()) if last_modified else None
+        )
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=timestamp,
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if etag:
+            response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class RetryWriteMixin:
+    """Повтор изменяющих действий при блокировке базы данных SQLite.
+
+    Создание, изменение и удаление выполняются в транзакции, которая
+    повторяется с экспоненциальной задержкой (см. `api.retry`).
+    """
+
+    retry_actions = ('create', 'update', 'partial_update', 'destroy')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for action in cls.retry_actions:
+            register_retry_metrics(f'{cls.__name__}.{action}')
+
+    def retry_write(self, handler, request, *args, **kwargs):
+        return call_with_retry(
+            f'{self.__class__.__name__}.{self.action}',
+            handler,
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def create(self, request, *args, **kwargs):
+        return self.retry_write(super().create, request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        return self.retry_write(super().update, request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        return self.retry_write(super().destroy, request, *args, **kwargs)
@@ -0,0 +1,184 @@
+import json
+from base64 import b64decode, b64encode
+from typing import List, NamedTuple, Optional, Tuple
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Диапазон целых чисел, которые SQLite принимает в параметрах запроса.
+MIN_CURSOR_INT: int = -2 ** 63
+MAX_CURSOR_INT: int = 2 ** 63 - 1
+
+
+class KeysetCursor(NamedTuple):
+    """Позиция курсора: значения полей сортировки и направление."""
+
+    position: tuple
+    reverse: bool
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Курсорная пагинация по составному ключу (keyset).
+
+    В отличие от CursorPagination из DRF, которая ищет позицию только
+    по первому полю сортировки и пропускает совпадающие значения
+    смещением, страница выбирается условием по всем полям сортировки:
+    для ('-pub_date', '-id') это `pub_date <= x AND (pub_date < x OR
+    (pub_date = x AND id < y))`. Нестрогое условие по первому полю
+    избыточно, но только его SQLite использует для поиска по индексу
+    (`pub_date<?`), остальные условия проверяются для найденных строк.
+    Последнее поле сортировки должно быть уникальным, тогда время
+    выборки страницы не зависит от ее номера и числа записей
+    с одинаковым значением первого поля.
+    """
+
+    page_size_query_param: str = 'limit'
+    max_page_size: int = 100
+    ordering: Tuple[str, ...] = ('id', )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.model = queryset.model
+        cursor: Optional[KeysetCursor] = self.decode_cursor(request)
+        reverse: bool = cursor is not None and cursor.reverse
+        ordering: List[str] = [
+            self.invert_field(field) if reverse else field
+            for field in self.ordering
+        ]
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(ordering, cursor.position)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more: bool = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    @staticmethod
+    def invert_field(field: str) -> str:
+        """Поле сортировки с противоположным направлением."""
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def get_keyset_filter(ordering: List[str], position) -> Q:
+        """Условие выборки записей, следующих за позицией курсора."""
+        condition = Q()
+        equal: dict = {}
+        for field, value in zip(ordering, position):
+            name: str = field.lstrip('-')
+            lookup: str = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        first: str = ordering[0]
+        bound: str = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': position[0]}) & condition
+
+    def get_position(self, instance) -> Tuple[str, ...]:
+        """Значения полей сортировки записи."""
+        return tuple(
+            str(getattr(instance, field.lstrip('-')))
+            for field in self.ordering
+        )
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        return self.encode_cursor(
+            KeysetCursor(self.get_position(self.page[-1]), reverse=False)
+        )
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param
+            )
+        return self.encode_cursor(
+            KeysetCursor(self.get_position(self.page[0]), reverse=True)
+        )
+
+    def decode_cursor(self, request) -> Optional[KeysetCursor]:
+        encoded: Optional[str] = request.query_params.get(
+            self.cursor_query_param
+        )
+        if encoded is None:
+            return None
+        try:
+            data: dict = json.loads(b64decode(encoded.encode()))
+            return KeysetCursor(
+                self.parse_position(data['p']), bool(data['r'])
+            )
+        except (
+            TypeError, ValueError, KeyError, OverflowError,
+            DjangoValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_position(self, values) -> Tuple:
+        """Приводит значения позиции курсора к типам полей сортировки."""
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValueError('Неверная длина позиции курсора.')
+        position: Tuple = tuple(
+            self.model._meta.get_field(field.lstrip('-')).to_python(value)
+            for field, value in zip(self.ordering, values)
+        )
+        if None in position:
+            raise ValueError('Позиция курсора не может содержать null.')
+        if any(
+            isinstance(value, int)
+            and not MIN_CURSOR_INT <= value <= MAX_CURSOR_INT
+            for value in position
+        ):
+            raise ValueError('Позиция курсора вне диапазона целых чисел.')
+        return position
+
+    def encode_cursor(self, cursor: KeysetCursor) -> str:
+        data: str = json.dumps({'p': cursor.position, 'r': cursor.reverse})
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            b64encode(data.encode()).decode(),
+        )
+
+
+class TitleCursorPagination(KeysetCursorPagination):
+    """Курсорная пагинация произведений по идентификатору.
+
+    Порядок по идентификатору несовместим с ранжированием результатов
+    полнотекстового поиска, поэтому запрос с параметром `search`
+    в этом режиме отклоняется.
+    """
+
+    ordering = ('id', )
+    unsupported_query_param: str = 'search'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.unsupported_query_param in request.query_params:
+            raise ValidationError({
+                self.unsupported_query_param: (
+                    'Курсорная пагинация не поддерживает полнотекстовый '
+                    'поиск, используйте пагинацию по умолчанию.'
+                ),
+            })
+        return super().paginate_queryset(queryset, request, view)
+
+
+class PubDateCursorPagination(KeysetCursorPagination):
+    """Курсорная пагинация отзывов и комментариев по дате публикации."""
+
+    ordering = ('-pub_date', '-id')
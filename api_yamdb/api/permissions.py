@@ -15,7 +15,7 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
         """Объект доступен для ред-ия автором, админом или модератором."""
         return (
             request.method in permissions.SAFE_METHODS
-            or obj.author == request.user
+            or obj.author_id == request.user.id
             or request.user.is_moderator
             or request.user.is_admin
         )
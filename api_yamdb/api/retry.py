@@ -0,0 +1,95 @@
+import math
+import random
+import time
+from functools import wraps
+from typing import Callable
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .metrics import increment_metric, register_metrics
+
+RETRY_METRIC_PREFIX: str = 'db_retry'
+
+
+class DatabaseLocked(APIException):
+    """Запись не удалась: база данных заблокирована дольше срока повторов.
+
+    Обработчик исключений DRF передает атрибут wait в заголовке
+    Retry-After, как для ответа 429.
+    """
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'База данных занята, повторите запрос позже.'
+    default_code = 'database_locked'
+
+    def __init__(self, wait: int, detail=None, code=None):
+        super().__init__(detail, code)
+        self.wait: int = wait
+
+
+def register_retry_metrics(name: str) -> None:
+    """Регистрирует метрики повторов записи с названием name."""
+    register_metrics(
+        f'{RETRY_METRIC_PREFIX}.{kind}.{name}'
+        for kind in ('retries', 'recovered', 'exhausted')
+    )
+
+
+def is_locked_error(error: OperationalError) -> bool:
+    """Ошибка вызвана блокировкой базы данных SQLite."""
+    return 'locked' in str(error)
+
+
+def get_backoff_delay(attempt: int) -> float:
+    """Экспоненциальная задержка с полным случайным разбросом."""
+    return random.uniform(0, min(
+        settings.DB_RETRY_MAX_DELAY,
+        settings.DB_RETRY_BASE_DELAY * 2 ** attempt,
+    ))
+
+
+def call_with_retry(name: str, func: Callable, *args, **kwargs):
+    """Выполняет func в транзакции, повторяя ее при блокировке базы данных.
+
+    Повторы прекращаются, когда следующая задержка выходит за
+    DB_RETRY_DEADLINE секунд от начала; тогда вызывается DatabaseLocked
+    (ответ 503). Внутри внешней транзакции повтор невозможен, и func
+    выполняется один раз.
+    """
+    if connection.in_atomic_block:
+        return func(*args, **kwargs)
+    deadline: float = time.monotonic() + settings.DB_RETRY_DEADLINE
+    attempt: int = 0
+    while True:
+        try:
+            with transaction.atomic():
+                result = func(*args, **kwargs)
+        except OperationalError as error:
+            if not is_locked_error(error):
+                raise
+            delay: float = get_backoff_delay(attempt)
+            if time.monotonic() + delay > deadline:
+                increment_metric(f'{RETRY_METRIC_PREFIX}.exhausted.{name}')
+                raise DatabaseLocked(
+                    max(1, math.ceil(settings.DB_RETRY_MAX_DELAY))
+                ) from error
+            increment_metric(f'{RETRY_METRIC_PREFIX}.retries.{name}')
+            time.sleep(delay)
+            attempt += 1
+        else:
+            if attempt:
+                increment_metric(f'{RETRY_METRIC_PREFIX}.recovered.{name}')
+            return result
+
+
+def retry_on_locked(func: Callable) -> Callable:
+    """Декоратор представления, повторяющий запись при блокировке SQLite."""
+    register_retry_metrics(func.__qualname__)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return call_with_retry(func.__qualname__, func, *args, **kwargs)
+    return wrapper
@@ -1,4 +1,7 @@
+from typing import Dict, List, Optional
+
 from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.fields import CharField, EmailField
 
@@ -112,6 +115,7 @@ class TitleCreateSerializer(serializers.ModelSerializer):
 
     genre = serializers.SlugRelatedField(
         many=True,
+        allow_empty=False,
         slug_field='slug',
         queryset=Genre.objects.all(),
     )
@@ -128,6 +132,134 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         )
 
 
+class TitleBulkListSerializer(serializers.ListSerializer):
+    """Массовое создание произведений.
+
+    Слаги категорий и жанров всех элементов разрешаются одним запросом
+    на каждую модель, произведения и связи с жанрами создаются пакетно.
+    Ошибки валидации возвращаются списком, по элементу на произведение.
+    """
+
+    MESSAGE_NOT_A_LIST: str = 'Ожидается список произведений.'
+    MESSAGE_TOO_MANY: str = 'Не больше {} произведений за один запрос.'
+    MESSAGE_NO_CATEGORY: str = 'Категории со слагом {} не существует.'
+    MESSAGE_NO_GENRES: str = 'Жанров со слагами {} не существует.'
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError(
+                {'non_field_errors': [self.MESSAGE_NOT_A_LIST]}
+            )
+        if len(data) > settings.TITLES_BULK_MAX_ITEMS:
+            raise serializers.ValidationError({
+                'non_field_errors': [
+                    self.MESSAGE_TOO_MANY.format(
+                        settings.TITLES_BULK_MAX_ITEMS
+                    )
+                ]
+            })
+
+        items: List[Optional[Dict]] = []
+        errors: List[Dict] = []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                items.append(None)
+                errors.append(exc.detail)
+        self.resolve_slugs(items, errors)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def resolve_slugs(
+        self,
+        items: List[Optional[Dict]],
+        errors: List[Dict],
+    ) -> None:
+        """Заменяет слаги категорий и жанров объектами моделей."""
+        valid_items: List[Dict] = [item for item in items if item]
+        categories = Category.objects.in_bulk(
+            {item['category'] for item in valid_items},
+            field_name='slug',
+        )
+        genres = Genre.objects.in_bulk(
+            {slug for item in valid_items for slug in item['genre']},
+            field_name='slug',
+        )
+        for item, error in zip(items, errors):
+            if item is None:
+                continue
+            if item['category'] not in categories:
+                error['category'] = [
+                    self.MESSAGE_NO_CATEGORY.format(item['category'])
+                ]
+            missing: List[str] = [
+                slug for slug in item['genre'] if slug not in genres
+            ]
+            if missing:
+                error['genre'] = [
+                    self.MESSAGE_NO_GENRES.format(', '.join(missing))
+                ]
+            item['category'] = categories.get(item['category'])
+            item['genre'] = [
+                genres[slug] for slug in item['genre'] if slug in genres
+            ]
+
+    def create(self, validated_data):
+        titles: List[Title] = [
+            Title(**{
+                field: value for field, value in item.items()
+                if field != 'genre'
+            })
+            for item in validated_data
+        ]
+        batch_size: int = settings.BULK_CREATE_BATCH_SIZE
+        with transaction.atomic():
+            Title.objects.bulk_create(titles, batch_size=batch_size)
+            if titles and titles[0].pk is None:
+                # Django не возвращает первичные ключи после bulk_create
+                # в SQLite. До конца транзакции вставлять строки может
+                # только она, поэтому ее строки - последние по id.
+                pks = Title.objects.order_by('-pk').values_list(
+                    'pk', flat=True
+                )[:len(titles)]
+                for title, pk in zip(titles, reversed(list(pks))):
+                    title.pk = pk
+            Title.genre.through.objects.bulk_create(
+                [
+                    Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+                    for title, item in zip(titles, validated_data)
+                    for genre in set(item['genre'])
+                ],
+                batch_size=batch_size,
+            )
+        return titles
+
+
+class TitleBulkCreateSerializer(serializers.ModelSerializer):
+    """Элемент массового создания произведений (без запросов к БД)."""
+
+    category = serializers.SlugField()
+    genre = serializers.ListField(
+        child=serializers.SlugField(),
+        allow_empty=False,
+    )
+
+    class Meta:
+        model = Title
+        fields = (
+            'name',
+            'year',
+            'description',
+            'genre',
+            'category',
+        )
+        list_serializer_class = TitleBulkListSerializer
+
+
 class ReviewsSerializer(serializers.ModelSerializer):
     """Класс сериализатора ревью."""
 
@@ -143,7 +275,7 @@ class ReviewsSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = '__all__'
+        exclude = ('updated_at', )
 
     def validate(self, data):
         title: str = self.context['view'].kwargs.get('title_id')
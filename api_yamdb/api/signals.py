@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user, invalidate_users
+from .cache import bump_model_version
+from reviews.models import Category, Genre, Review, Title
+from users.models import User
+from users.signals import users_changed
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_catalog_version(sender, **kwargs):
+    """Инвалидирует кэш ответов при изменении данных каталога."""
+    bump_model_version(sender)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_genres_version(sender, action, **kwargs):
+    """Инвалидирует кэш ответов при изменении жанров произведения."""
+    if action.startswith('post_'):
+        bump_model_version(Title)
+
+
+@receiver(post_save, sender=User)
+def bump_user_version(sender, instance, created, **kwargs):
+    """Меняет ETag списков отзывов при переименовании автора.
+
+    Остальные поля пользователя в отзывах не выводятся, а у нового
+    пользователя еще нет отзывов, поэтому регистрация, изменение профиля
+    и версии токенов валидаторы ответов не меняют.
+    """
+    if not created and instance.username_changed():
+        bump_model_version(sender)
+
+
+@receiver(post_delete, sender=User)
+def bump_deleted_user_version(sender, **kwargs):
+    """Меняет ETag списков отзывов при удалении автора вместе с отзывами."""
+    bump_model_version(sender)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Сбрасывает кэш аутентификации при изменении или удалении юзера.
+
+    Версия сбрасывается сразу и повторно после фиксации транзакции, чтобы
+    конкурентный запрос не закэшировал данные до изменения.
+    """
+    user_id: int = instance.pk
+    invalidate_user(user_id)
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
+@receiver(users_changed, sender=User)
+def invalidate_changed_users(sender, user_ids, fields=(), **kwargs):
+    """Сбрасывает кэш аутентификации пользователей, измененных пакетно."""
+    user_ids = list(user_ids)
+    invalidate_users(user_ids)
+    if 'username' in fields:
+        bump_model_version(sender)
+    transaction.on_commit(lambda: invalidate_users(user_ids))
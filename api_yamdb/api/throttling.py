@@ -0,0 +1,98 @@
+import hashlib
+import time
+from typing import Optional, Tuple
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .cache import get_cache
+from .metrics import increment_metric, register_metrics
+
+THROTTLE_KEY_PREFIX: str = 'throttle'
+THROTTLE_METRIC_PREFIX: str = 'throttle.rejected'
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """Разбирает частоту вида '5/min': емкость корзины и период в секундах.
+
+    Формат совпадает с DEFAULT_THROTTLE_RATES встроенных ограничителей DRF.
+    """
+    number, period = rate.split('/')
+    return int(number), PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Ограничение частоты запросов по алгоритму token bucket.
+
+    Корзина емкостью N из частоты 'N/период' пополняется равномерно
+    за период, поэтому допускается всплеск до N запросов. Состояние
+    хранится в общем кэше и разделяется всеми процессами приложения;
+    одновременные запросы могут изредка пропустить лишний запрос.
+    Частота `None` для области отключает ограничение.
+    """
+
+    scope: Optional[str] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.scope is not None:
+            register_metrics((f'{THROTTLE_METRIC_PREFIX}.{cls.scope}', ))
+
+    def get_bucket_ident(self, request) -> Optional[str]:
+        """Идентификатор корзины или None, если ограничение не нужно."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view) -> bool:
+        rate: Optional[str] = api_settings.DEFAULT_THROTTLE_RATES.get(
+            self.scope
+        )
+        ident: Optional[str] = self.get_bucket_ident(request)
+        if rate is None or ident is None:
+            return True
+        capacity, duration = parse_rate(rate)
+        refill_rate: float = capacity / duration
+
+        cache = get_cache()
+        key: str = f'{THROTTLE_KEY_PREFIX}:{self.scope}:{ident}'
+        now: float = time.time()
+        tokens, updated_at = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+        if tokens >= 1:
+            cache.set(key, (tokens - 1, now), duration)
+            return True
+        cache.set(key, (tokens, now), duration)
+        self.wait_time: float = (1 - tokens) / refill_rate
+        increment_metric(f'{THROTTLE_METRIC_PREFIX}.{self.scope}')
+        return False
+
+    def wait(self) -> Optional[float]:
+        return getattr(self, 'wait_time', None)
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Ограничение запросов регистрации и получения токена по IP-адресу.
+
+    Адрес определяет get_ident() по REST_FRAMEWORK['NUM_PROXIES']: без
+    прокси это REMOTE_ADDR, а X-Forwarded-For учитывается только в части,
+    добавленной доверенными прокси. Иначе клиент обходил бы ограничение,
+    меняя заголовок в каждом запросе.
+    """
+
+    scope = 'auth_ip'
+
+    def get_bucket_ident(self, request) -> Optional[str]:
+        return self.get_ident(request)
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    """Ограничение запросов регистрации и получения токена по username."""
+
+    scope = 'auth_username'
+
+    def get_bucket_ident(self, request) -> Optional[str]:
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        return hashlib.md5(username.casefold().encode()).hexdigest()
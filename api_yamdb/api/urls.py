@@ -3,7 +3,8 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewsSet, CommentViewSet, GenreViewsSet,
                     ReviewViewSet, TitleCreateViewsSet, UserViewSet,
-                    get_jwt_token, signup, user_profile)
+                    export_data, get_jwt_token, metrics, signup,
+                    user_profile)
 
 v1_router = DefaultRouter()
 v1_router.register('users', UserViewSet)
@@ -26,5 +27,7 @@ urlpatterns = [
     path('v1/auth/signup/', signup, name='signup'),
     path('v1/auth/token/', get_jwt_token, name='get_jwt_token'),
     path('v1/users/me/', user_profile, name='user_profile'),
+    path('v1/export/<str:dataset>/', export_data, name='export_data'),
+    path('v1/metrics/', metrics, name='metrics'),
     path('v1/', include(v1_router.urls)),
 ]
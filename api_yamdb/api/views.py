@@ -1,30 +1,43 @@
+import hashlib
+from typing import Optional
+
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
 from django.db.utils import IntegrityError
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework import status
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
-from rest_framework_simplejwt.tokens import RefreshToken
-
 
-from .filters import TitleFilter
-from .mixins import CLDViewSet
+from .authentication import get_access_token
+from .cache import (VersionedCacheMixin, bump_model_version,
+                    get_model_versions, get_versions_modified)
+from .export import EXPORTERS, stream_ndjson
+from .filters import PrefixSearchFilter, TitleFilter
+from .metrics import get_metrics
+from .mixins import (CLDViewSet, ConditionalGetMixin, CursorPaginationMixin,
+                     RetryWriteMixin)
+from .pagination import PubDateCursorPagination, TitleCursorPagination
 from .permissions import IsAdmin, IsAdminOrReadOnly, IsAuthorOrReadOnly
+from .retry import call_with_retry, register_retry_metrics, retry_on_locked
 from .serializers import (CategorySerializer, CommentsSerializer,
                           GenreSerializer, ReviewsSerializer, SignUpSerializer,
-                          TitleCreateSerializer, TitleReadOnlySerializer,
-                          TokenSerializer, UserSerializer)
+                          TitleBulkCreateSerializer, TitleCreateSerializer,
+                          TitleReadOnlySerializer, TokenSerializer,
+                          UserSerializer)
+from .throttling import AuthIPThrottle, AuthUsernameThrottle
 from reviews.models import Category, Genre, Review, Title
 from users.models import User
+from users.outbox import (enqueue_email, is_resend_suppressed,
+                          suppress_resend)
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(RetryWriteMixin, ModelViewSet):
     """Вьюсет для работы с моделью User (пользователь)."""
 
     http_method_names = ['get', 'post', 'head', 'patch', 'delete']
@@ -32,45 +45,60 @@ class UserViewSet(ModelViewSet):
     serializer_class = UserSerializer
     lookup_field = 'username'
     permission_classes = (IsAdmin, )
-    filter_backends = (filters.SearchFilter, )
-    search_fields = ('username', )
+    filter_backends = (PrefixSearchFilter, )
+    search_fields = ('username_search', )
     pagination_class = PageNumberPagination
 
 
+@retry_on_locked
+def register_user(username: str, email: str) -> Optional[User]:
+    """Создает пользователя и ставит в очередь письмо с кодом.
+
+    Возвращает None, если username или email уже заняты другой парой.
+    """
+    try:
+        user, created = User.objects.get_or_create(
+            username=username,
+            email=email,
+        )
+    except IntegrityError:
+        return None
+
+    confirm_code: str = default_token_generator.make_token(user)
+    enqueue_email(
+        'YaMDb: подтверждение регистрации.',
+        f'Код для подтверждения регистрации: {confirm_code}',
+        'yamdb_service@ya.ru',
+        user.email,
+    )
+    suppress_resend(username, email)
+    return user
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def signup(request) -> Response:
     """Регистрация нового пользователя."""
     serializer = SignUpSerializer(data=request.data)
     if serializer.is_valid():
         username: str = serializer.validated_data['username']
         email: str = serializer.validated_data['email']
+        if is_resend_suppressed(username, email):
+            return Response(serializer.data, status=status.HTTP_200_OK)
 
-        try:
-            user, created = User.objects.get_or_create(
-                username=username,
-                email=email,
-            )
-        except IntegrityError:
+        if register_user(username, email) is None:
             return Response(
                 'Нельзя использовать данный электронный адрес!',
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-        confirm_code: str = default_token_generator.make_token(user)
-        send_mail(
-            'YaMDb: подтверждение регистрации.',
-            f'Код для подтверждения регистрации: {confirm_code}',
-            'yamdb_service@ya.ru',
-            [user.email, ],
-            fail_silently=False,
-        )
         return Response(serializer.data, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def get_jwt_token(request) -> Response:
     """Получение JWT-токена."""
     serializer = TokenSerializer(data=request.data)
@@ -80,7 +108,7 @@ def get_jwt_token(request) -> Response:
         user: User = get_object_or_404(User, username=username)
 
         if default_token_generator.check_token(user, confirm_code):
-            new_token: str = str(RefreshToken.for_user(user).access_token)
+            new_token: str = str(get_access_token(user))
             return Response(
                 {'token': new_token, },
                 status=status.HTTP_200_OK,
@@ -92,6 +120,10 @@ def get_jwt_token(request) -> Response:
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+USER_PROFILE_RETRY: str = 'user_profile'
+register_retry_metrics(USER_PROFILE_RETRY)
+
+
 @api_view(['GET', 'PATCH'])
 def user_profile(request) -> Response:
     """Персональная страница пользователя."""
@@ -103,37 +135,70 @@ def user_profile(request) -> Response:
             partial=True,
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save(role=current_user.role)
+        call_with_retry(
+            USER_PROFILE_RETRY, serializer.save, role=current_user.role
+        )
     serializer = UserSerializer(current_user)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CategoryViewsSet(CLDViewSet):
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def export_data(request, dataset: str) -> StreamingHttpResponse:
+    """Потоковая выгрузка произведений, отзывов или комментариев в NDJSON."""
+    if dataset not in EXPORTERS:
+        raise Http404
+    response = StreamingHttpResponse(
+        stream_ndjson(dataset),
+        content_type='application/x-ndjson; charset=utf-8',
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{dataset}.ndjson"'
+    )
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def metrics(request) -> Response:
+    """Счетчики метрик приложения (повторы записи и другие)."""
+    return Response(get_metrics(), status=status.HTTP_200_OK)
+
+
+class CategoryViewsSet(RetryWriteMixin, VersionedCacheMixin, CLDViewSet):
     """Вьюсет для работы с моделью Category (Категория)."""
 
+    cache_dependencies = (Category, )
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-    filter_backends = (filters.SearchFilter, )
-    search_fields = ('name', )
+    filter_backends = (PrefixSearchFilter, )
+    search_fields = ('name_search', )
     permission_classes = (IsAdminOrReadOnly, )
     lookup_field = 'slug'
 
 
-class GenreViewsSet(CLDViewSet):
+class GenreViewsSet(RetryWriteMixin, VersionedCacheMixin, CLDViewSet):
     """Вьюсет для работы с моделью Genre (Жанр)."""
 
+    cache_dependencies = (Genre, )
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
-    filter_backends = (filters.SearchFilter, )
-    search_fields = ('name', )
+    filter_backends = (PrefixSearchFilter, )
+    search_fields = ('name_search', )
     permission_classes = (IsAdminOrReadOnly, )
     lookup_field = 'slug'
 
 
-class TitleCreateViewsSet(ModelViewSet):
+class TitleCreateViewsSet(RetryWriteMixin, VersionedCacheMixin,
+                          ConditionalGetMixin, CursorPaginationMixin,
+                          ModelViewSet):
     """Вьюсет для работы с моделью Title (Произведение)."""
 
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    cache_dependencies = (Title, Category, Genre, Review)
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
+    cursor_pagination_class = TitleCursorPagination
     serializer_class = TitleCreateSerializer
     filter_backends = (DjangoFilterBackend, )
     filterset_class = TitleFilter
@@ -142,20 +207,81 @@ class TitleCreateViewsSet(ModelViewSet):
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve', ):
             return TitleReadOnlySerializer
+        if self.action == 'bulk':
+            return TitleBulkCreateSerializer
         return TitleCreateSerializer
 
+    @action(detail=False, methods=['post'])
+    @retry_on_locked
+    def bulk(self, request):
+        """Массовое создание произведений."""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        titles = serializer.save()
+        bump_model_version(Title)
+        queryset = self.get_queryset().filter(
+            pk__in=[title.pk for title in titles]
+        ).order_by('pk')
+        return Response(
+            TitleReadOnlySerializer(queryset, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
 
-class ReviewViewSet(ModelViewSet):
+    def get_conditional_validators(self):
+        if self.action != 'retrieve':
+            return None, None
+        updated_at = get_object_or_404(
+            Title.objects.values_list('updated_at', flat=True),
+            pk=self.kwargs.get('pk'),
+        )
+        versions = get_model_versions((Category, Genre))
+        etag: str = '-'.join((
+            'title',
+            str(self.kwargs.get('pk')),
+            str(updated_at.timestamp()),
+            *(str(version) for version in versions.values()),
+        ))
+        return etag, max(updated_at, get_versions_modified(versions))
+
+
+class ReviewViewSet(RetryWriteMixin, ConditionalGetMixin,
+                    CursorPaginationMixin, ModelViewSet):
     """Класс представления ревью."""
 
     serializer_class = ReviewsSerializer
+    cursor_pagination_class = PubDateCursorPagination
     permission_classes = (IsAuthorOrReadOnly, )
 
     def get_title_obj(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id')
+            )
+        return self._title
+
+    def get_conditional_validators(self):
+        if self.action != 'list':
+            return None, None
+        title: Title = self.get_title_obj()
+        query: str = hashlib.md5(
+            self.request.META.get('QUERY_STRING', '').encode()
+        ).hexdigest()
+        versions = get_model_versions((User, ))
+        etag: str = '-'.join((
+            'reviews',
+            str(title.pk),
+            str(title.updated_at.timestamp()),
+            *(str(version) for version in versions.values()),
+            query,
+        ))
+        return etag, max(
+            title.updated_at, get_versions_modified(versions)
+        )
 
     def get_queryset(self):
-        return self.get_title_obj().reviews.all()
+        return self.get_title_obj().reviews.select_related(
+            'author', 'title',
+        )
 
     def perform_create(self, serializer):
         if serializer.is_valid():
@@ -165,17 +291,19 @@ class ReviewViewSet(ModelViewSet):
             )
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(RetryWriteMixin, CursorPaginationMixin,
+                     ModelViewSet):
     """Класс представления комментариев."""
 
     serializer_class = CommentsSerializer
+    cursor_pagination_class = PubDateCursorPagination
     permission_classes = (IsAuthorOrReadOnly, )
 
     def get_review_obj(self):
         return get_object_or_404(Review, pk=self.kwargs.get('review_id'))
 
     def get_queryset(self):
-        return self.get_review_obj().comments.all()
+        return self.get_review_obj().comments.select_related('author')
 
     def perform_create(self, serializer):
         if serializer.is_valid():
@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +71,62 @@ DATABASES = {
     }
 }
 
+# Профиль production (DJANGO_DATABASE_PROFILE=production): постоянные
+# соединения и PRAGMA, выполняемые при открытии каждого соединения SQLite.
+DATABASE_PROFILE: str = os.getenv('DJANGO_DATABASE_PROFILE', 'development')
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+DATABASE_PROFILES = {
+    'development': {'CONN_MAX_AGE': 0, 'SQLITE_PRAGMAS': {}},
+    'production': {
+        'CONN_MAX_AGE': 600,
+        'SQLITE_PRAGMAS': SQLITE_PRODUCTION_PRAGMAS,
+    },
+}
+DATABASES['default']['CONN_MAX_AGE'] = (
+    DATABASE_PROFILES[DATABASE_PROFILE]['CONN_MAX_AGE']
+)
+SQLITE_PRAGMAS = DATABASE_PROFILES[DATABASE_PROFILE]['SQLITE_PRAGMAS']
+
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# В профиле production кэш хранит версии токенов и данных пользователей
+# и потому должен быть общим для всех процессов приложения.
+if DATABASE_PROFILE == 'production':
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('DJANGO_CACHE_DIR', BASE_DIR / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+
+RESPONSE_CACHE_ALIAS: str = 'default'
+RESPONSE_CACHE_TIMEOUT: int = 60 * 5
+
+# Users authenticated by JWT are cached per process (seconds)
+USER_CACHE_MAX_SIZE: int = 1024
+USER_CACHE_TIMEOUT: int = 60
+# Token versions are cached in the shared cache (seconds). With a
+# per-process cache this bounds how long a revoked role stays valid in
+# the other processes, so the production profile requires a shared one.
+TOKEN_VERSION_CACHE_TIMEOUT: int = 30
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
 
 # Password validation
 
@@ -96,10 +153,18 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 15,
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '30/min',
+        'auth_username': '5/min',
+    },
+    # Number of reverse proxies in front of the app. With 0 the client IP
+    # is REMOTE_ADDR and X-Forwarded-For, which clients can forge, is
+    # ignored; None would trust X-Forwarded-For as is.
+    'NUM_PROXIES': int(os.getenv('DJANGO_NUM_PROXIES', '0')),
 }
 
 # Internationalization
@@ -121,19 +186,68 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
-DATA_FILE_PATH = os.path.join(BASE_DIR, 'static\\data\\')
+DATA_FILE_PATH = os.path.join(BASE_DIR, 'static', 'data')
 
 # Email Backend settings
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Outbox of emails: 'thread' wakes the process's background sender
+# thread after the request transaction commits, 'worker' leaves it to the
+# send_outbox command, 'on_commit' sends it synchronously after commit
+# (inside the request; meant for tests and debugging).
+EMAIL_OUTBOX_DELIVERY: str = os.getenv(
+    'DJANGO_EMAIL_OUTBOX_DELIVERY', 'thread'
+)
+EMAIL_OUTBOX_BATCH_SIZE: int = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+EMAIL_OUTBOX_RETRY_DELAY: int = 60
+# The background sender thread also checks the outbox this often (seconds)
+# to retry postponed emails.
+EMAIL_OUTBOX_POLL_INTERVAL: int = 30
+# A claimed email is released for other senders after this many seconds.
+EMAIL_OUTBOX_LOCK_TIMEOUT: int = 300
+
+# Repeat signups within this window (seconds) do not send a new code;
+# 0 disables the check.
+SIGNUP_RESEND_WINDOW: int = 60
+
 # JWT token
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Bulk operations
+
+BULK_CREATE_BATCH_SIZE: int = 500
+TITLES_BULK_MAX_ITEMS: int = 1000
+EXPORT_CHUNK_SIZE: int = 2000
+
+# Retry of writes on "database is locked" (seconds)
+
+DB_RETRY_DEADLINE: float = 3.0
+DB_RETRY_BASE_DELAY: float = 0.02
+DB_RETRY_MAX_DELAY: float = 0.5
+
+# SQL query budgets (per url name, the default applies to the rest)
+
+QUERY_BUDGET_DEFAULT: int = 10
+QUERY_BUDGETS = {
+    'titles-list': 4,
+    'titles-detail': 4,
+    'reviews-list': 4,
+    'reviews-detail': 3,
+    'comments-list': 4,
+    'comments-detail': 3,
+    'categories-list': 3,
+    'genres-list': 3,
+    'user-list': 3,
+    'user-detail': 2,
+    'user_profile': 1,
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
 # DataBase Constants
@@ -142,5 +256,10 @@ LIMIT_USERNAME_LENGTH: int = 150
 LIMIT_USER_BIO_LENGTH: int = 254
 LIMIT_USER_EMAIL_LENGTH: int = 254
 LIMIT_USER_ROLE_LENTGH: int = 25
+LIMIT_EMAIL_SUBJECT_LENGTH: int = 255
+LIMIT_OUTBOX_LOCK_TOKEN_LENGTH: int = 32
 LIMIT_NAME_LENGHT: int = 256
 LIMIT_SLUG_LENGHT: int = 50
+LIMIT_IMPORT_FILE_NAME_LENGTH: int = 100
+LIMIT_IMPORT_ROW_KEY_LENGTH: int = 64
+LIMIT_IMPORT_CHECKSUM_LENGTH: int = 32
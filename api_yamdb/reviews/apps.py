@@ -5,3 +5,12 @@ class ReviewsConfig(AppConfig):
     """Класс конфигурации для приложения 'reviews'."""
 
     name = 'reviews'
+
+    def ready(self):
+        """Подключение обработчиков сигналов приложения."""
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+
+        from . import signals
+        post_migrate.connect(signals.restore_title_fts, sender=self)
+        connection_created.connect(signals.configure_sqlite)
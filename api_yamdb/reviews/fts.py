@@ -0,0 +1,95 @@
+from typing import Tuple
+
+FTS_TABLE: str = 'reviews_title_fts'
+
+CREATE_TABLE_SQL: str = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name,
+        description,
+        content='reviews_title',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+TRIGGERS_SQL: Tuple[Tuple[str, str], ...] = (
+    (
+        f'{FTS_TABLE}_insert',
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+        AFTER INSERT ON reviews_title BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+        """,
+    ),
+    (
+        f'{FTS_TABLE}_delete',
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+        AFTER DELETE ON reviews_title BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+        """,
+    ),
+    (
+        f'{FTS_TABLE}_update',
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+        AFTER UPDATE OF name, description ON reviews_title BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+        """,
+    ),
+)
+
+REBUILD_SQL: str = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+)
+
+DROP_SQL: Tuple[str, ...] = (
+    *(f'DROP TRIGGER IF EXISTS {name}' for name, _ in TRIGGERS_SQL),
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def install_title_fts(connection) -> bool:
+    """Создает индекс FTS5 произведений и триггеры его синхронизации.
+
+    SQLite удаляет триггеры вместе с таблицей, а миграции, изменяющие
+    таблицу произведений, пересоздают ее. Поэтому недостающие триггеры
+    создаются заново, а индекс перестраивается. Возвращает True, если
+    индекс был перестроен.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"
+            " AND name LIKE %s",
+            (f'{FTS_TABLE}%', ),
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [
+            sql for name, sql in TRIGGERS_SQL if name not in existing
+        ]
+        if FTS_TABLE in existing and not missing:
+            return False
+        cursor.execute(CREATE_TABLE_SQL)
+        for sql in missing:
+            cursor.execute(sql)
+        cursor.execute(REBUILD_SQL)
+    return True
+
+
+def drop_title_fts(connection) -> None:
+    """Удаляет индекс FTS5 произведений и его триггеры."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for sql in DROP_SQL:
+            cursor.execute(sql)
@@ -0,0 +1,311 @@
+import csv
+import gzip
+import hashlib
+import io
+import json
+import mmap
+import os
+import pickle
+from itertools import islice
+from typing import (Dict, Iterable, Iterator, List, NamedTuple, Optional, Set,
+                    Tuple)
+
+import django
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import connections, router
+from django.db.models import Field, Model
+from django.utils import timezone
+
+# Строка, готовая к записи: первичный ключ, значения столбцов INSERT
+# и контрольная сумма исходной строки файла.
+Row = Tuple[str, tuple, str]
+ParsedChunk = Tuple[List[Row], List[str], List[str]]
+KnownKeys = Dict[str, Set[object]]
+
+# Ключи связанных моделей загружаются процессом один раз на файл.
+loaded_keys: Dict[str, KnownKeys] = {}
+
+
+class ChunkTask(NamedTuple):
+    """Задача разбора пакета строк файла.
+
+    Пакет обычного CSV-файла задается смещением и длиной в байтах, и
+    процесс-обработчик читает его сам; строки сжатого файла, в котором
+    нельзя перейти к смещению, читаются заранее и передаются в rows.
+    keys_path - файл с первичными ключами связанных моделей (см.
+    save_known_keys).
+    """
+
+    path: str
+    file_name: str
+    model_label: str
+    foreign_keys: List[str]
+    fieldnames: List[str]
+    keys_path: Optional[str] = None
+    offset: int = 0
+    length: int = 0
+    first_line: int = 1
+    rows: Optional[List[Tuple[int, Dict[str, str]]]] = None
+
+
+def open_data_file(path: str):
+    """Открывает CSV-файл или его сжатую копию (*.csv.gz)."""
+    if not os.path.exists(path) and os.path.exists(f'{path}.gz'):
+        return gzip.open(f'{path}.gz', 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def get_reader(data_file, fieldnames: Optional[List[str]] = None):
+    return csv.DictReader(
+        data_file,
+        fieldnames=fieldnames,
+        delimiter=',',
+        quotechar='"',
+        skipinitialspace=True,
+    )
+
+
+def read_chunks(
+    data_file,
+    chunk_size: int,
+) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    """Читает строки CSV-файла пакетами с номерами строк файла."""
+    reader = get_reader(data_file)
+    rows = ((reader.line_num, dict(**row)) for row in reader)
+    chunk = list(islice(rows, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, chunk_size))
+
+
+def split_file(
+    file_path: str,
+    chunk_size: int,
+) -> Iterator[Tuple[int, int, int]]:
+    """Делит CSV-файл на пакеты по chunk_size строк без разбора полей.
+
+    Возвращает смещение, длину пакета в байтах и количество физических
+    строк файла перед пакетом. Пакет содержит chunk_size физических строк
+    и продлевается, пока в нем нечетное число кавычек, поэтому переводы
+    строк внутри значений в кавычках пакеты не разрывают. Файл
+    отображается в память, а переводы строк и кавычки ищут методы mmap,
+    так что файл не читается построчно.
+    """
+    with open(file_path, 'rb') as data_file:
+        if not os.fstat(data_file.fileno()).st_size:
+            return
+        data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+    with data:
+        size: int = len(data)
+        find = data.find
+        start: int = find(b'\n') + 1 or size
+        first_line: int = 1
+        while start < size:
+            end, lines = start, 0
+            while end < size and (
+                lines < chunk_size or data[start:end].count(b'"') % 2
+            ):
+                end = find(b'\n', end) + 1 or size
+                lines += 1
+            yield start, end - start, first_line
+            start, first_line = end, first_line + lines
+
+
+def read_header(file_path: str) -> List[str]:
+    """Названия колонок CSV-файла."""
+    with open_data_file(file_path) as data_file:
+        return get_reader(data_file).fieldnames or []
+
+
+def get_checksum(row: Dict[str, str]) -> str:
+    """Контрольная сумма исходной строки CSV-файла."""
+    return hashlib.md5(
+        json.dumps(row, sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+
+
+def clean_row(model: Model, row: Dict[str, str], skip: Iterable[str]):
+    """Приводит значения строки к типам полей модели и проверяет их.
+
+    Колонки из skip (внешние ключи) остаются строками: их проверяет
+    resolve_foreign_keys. Пустая строка в поле, которое
+    не хранит пустые строки (число, дата), означает отсутствие значения.
+    """
+    errors: List[str] = []
+    for column, value in row.items():
+        if column in skip:
+            continue
+        field = model._meta.get_field(column)
+        if value == '' and (field.null or not field.empty_strings_allowed):
+            value = None
+        try:
+            row[column] = field.clean(value, None)
+        except ValidationError as exc:
+            errors.append(f'{column}: {" ".join(exc.messages)}')
+    return errors
+
+
+def read_task_rows(task: ChunkTask) -> List[Tuple[int, Dict[str, str]]]:
+    """Строки пакета с номерами строк файла."""
+    if task.rows is not None:
+        return task.rows
+    with open(os.path.join(task.path, task.file_name), 'rb') as data_file:
+        data_file.seek(task.offset)
+        text: str = data_file.read(task.length).decode('utf-8')
+    reader = get_reader(io.StringIO(text, newline=''), task.fieldnames)
+    return [
+        (task.first_line + reader.line_num, dict(**row)) for row in reader
+    ]
+
+
+def save_known_keys(
+    keys_path: str,
+    db_model: Model,
+    foreign_keys: Iterable[str],
+) -> None:
+    """Сохраняет в файл первичные ключи моделей, на которые ссылается файл.
+
+    Связанные файлы к этому времени уже загружены, поэтому ключи
+    запрашиваются один раз на файл, до начала его транзакции, а процессы
+    пула читают их из файла и не обращаются к базе данных.
+    """
+    known: KnownKeys = {
+        column: set(
+            db_model._meta.get_field(column).related_model.objects
+            .values_list('pk', flat=True).iterator()
+        )
+        for column in foreign_keys
+    }
+    with open(keys_path, 'wb') as keys_file:
+        pickle.dump(known, keys_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def get_known_keys(keys_path: Optional[str]) -> KnownKeys:
+    """Ключи связанных моделей из файла save_known_keys.
+
+    В процессе хранятся ключи только последнего файла.
+    """
+    if keys_path is None:
+        return {}
+    if keys_path not in loaded_keys:
+        loaded_keys.clear()
+        with open(keys_path, 'rb') as keys_file:
+            loaded_keys[keys_path] = pickle.load(keys_file)
+    return loaded_keys[keys_path]
+
+
+def resolve_foreign_keys(
+    model: Model,
+    row: Dict[str, object],
+    known: KnownKeys,
+) -> List[str]:
+    """Проверяет внешние ключи строки по ключам связанных моделей.
+
+    Колонка может называться как поле (`author`) или как его столбец
+    (`title_id`). Значения присваиваются полям `<поле>_id`. Возвращает
+    описания ссылок на несуществующие объекты.
+    """
+    unresolved: List[str] = []
+    for column, keys in known.items():
+        field = model._meta.get_field(column)
+        value = row.pop(column)
+        if not value and field.null:
+            row[field.attname] = None
+            continue
+        try:
+            row[field.attname] = field.target_field.to_python(value)
+        except ValidationError:
+            row[field.attname] = value
+        if row[field.attname] not in keys:
+            unresolved.append(f'{column}={value!r}')
+    return unresolved
+
+
+def get_insert_fields(model: Model, fieldnames: Iterable[str]) -> List[Field]:
+    """Поля модели в порядке столбцов INSERT, как у bulk_create.
+
+    Первичный ключ записывается, только если он есть в файле.
+    """
+    pk_column: str = model._meta.pk.attname
+    has_pk: bool = any(
+        model._meta.get_field(column).attname == pk_column
+        for column in fieldnames
+    )
+    return [
+        field for field in model._meta.concrete_fields
+        if has_pk or not field.primary_key
+    ]
+
+
+def get_insert_values(obj: Model, fields: List[Field], connection, now):
+    """Значения полей объекта, подготовленные для базы данных.
+
+    Даты auto_now_add из файла сохраняются, а без значения в файле поле
+    получает текущее время, как при создании объекта через API.
+    """
+    values: List[object] = []
+    for field in fields:
+        if getattr(field, 'auto_now_add', False):
+            value = getattr(obj, field.attname) or now
+        else:
+            value = field.pre_save(obj, add=True)
+        values.append(field.get_db_prep_save(value, connection=connection))
+    return tuple(values)
+
+
+def parse_chunk(task: ChunkTask) -> ParsedChunk:
+    """Готовит строки пакета к записи, не обращаясь к базе данных.
+
+    Строки проверяются, внешние ключи сверяются с ключами связанных
+    моделей, и из строки создается объект модели, значения полей которого
+    подготавливаются для INSERT. Возвращает строки в виде кортежей
+    значений (их дешевле передавать между процессами, чем объекты модели),
+    сообщения о пропущенных строках и первичные ключи пропущенных строк.
+    """
+    model: Model = apps.get_model(task.model_label)
+    connection = connections[router.db_for_write(model)]
+    fields: List[Field] = get_insert_fields(model, task.fieldnames)
+    known: KnownKeys = get_known_keys(task.keys_path)
+    pk_column: str = model._meta.pk.attname
+    now = timezone.now()
+    rows: List[Row] = []
+    messages: List[str] = []
+    rejected: List[str] = []
+    for line_number, row in read_task_rows(task):
+        checksum: str = get_checksum(row)
+        row_key: str = str(row.get(pk_column))
+        errors: List[str] = clean_row(model, row, task.foreign_keys)
+        if errors:
+            messages.append(
+                f'{task.file_name}, строка {line_number}: '
+                f'{"; ".join(errors)} Строка пропущена.'
+            )
+            rejected.append(row_key)
+            continue
+        unresolved: List[str] = resolve_foreign_keys(model, row, known)
+        if unresolved:
+            messages.append(
+                f'{task.file_name}, строка {line_number}: не найдены '
+                f'связанные объекты {", ".join(unresolved)}. '
+                'Строка пропущена.'
+            )
+            rejected.append(row_key)
+            continue
+        obj: Model = model(**row)
+        if hasattr(obj, 'set_search_fields'):
+            obj.set_search_fields()
+        rows.append((
+            row_key, get_insert_values(obj, fields, connection, now), checksum
+        ))
+    return rows, messages, rejected
+
+
+def init_worker() -> None:
+    """Подготавливает процесс-обработчик к разбору пакетов.
+
+    Процессы запускаются методом spawn, поэтому Django настраивается
+    заново. Модуль не импортирует модели, чтобы его можно было загрузить
+    в новом процессе до вызова django.setup().
+    """
+    django.setup()
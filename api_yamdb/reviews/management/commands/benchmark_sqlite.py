@@ -0,0 +1,185 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, call_command
+from django.db import OperationalError, connections, transaction
+from django.test import override_settings
+
+from reviews.models import Review, Title
+
+User = get_user_model()
+
+# Псевдоним временной базы данных, на которой выполняется прогон профиля.
+BENCHMARK_DATABASE: str = 'benchmark'
+
+
+class Worker(threading.Thread):
+    """Поток, выполняющий чтения или записи до истечения времени.
+
+    Каждая операция обрабатывается как отдельный запрос к API: до и после
+    нее соединение потока закрывается, если так требует CONN_MAX_AGE
+    профиля (как это делают обработчики request_started/request_finished).
+    """
+
+    def __init__(self, writer: bool, number: int, options) -> None:
+        super().__init__()
+        self.writer: bool = writer
+        self.number: int = number
+        self.options = options
+        self.rng = random.Random(number)
+        self.operations: int = 0
+        self.errors: int = 0
+        self.author: Optional[User] = None
+
+    def get_author(self) -> User:
+        """Автор очередного отзыва: у автора один отзыв на произведение."""
+        batch: int = self.operations // self.options['titles']
+        username: str = f'benchmark_{self.number}_{batch}'
+        if self.author is None or self.author.username != username:
+            self.author = User.objects.db_manager(BENCHMARK_DATABASE).create(
+                username=username,
+                email=f'{username}@yamdb.fake',
+            )
+        return self.author
+
+    def operate(self) -> None:
+        if not self.writer:
+            title_id: int = self.rng.randint(1, self.options['titles'])
+            list(
+                Review.objects.using(BENCHMARK_DATABASE)
+                .filter(title_id=title_id)
+                .select_related('title', 'author')
+                .order_by('-pk')[:10]
+            )
+            return
+        with transaction.atomic(using=BENCHMARK_DATABASE):
+            Review.objects.using(BENCHMARK_DATABASE).create(
+                title_id=self.operations % self.options['titles'] + 1,
+                author=self.get_author(),
+                score=self.rng.randint(1, 10),
+                text='benchmark',
+            )
+
+    def run(self) -> None:
+        connection = connections[BENCHMARK_DATABASE]
+        deadline: float = time.monotonic() + self.options['duration']
+        try:
+            while time.monotonic() < deadline:
+                connection.close_if_unusable_or_obsolete()
+                try:
+                    self.operate()
+                    self.operations += 1
+                except OperationalError:
+                    self.errors += 1
+                finally:
+                    connection.close_if_unusable_or_obsolete()
+        finally:
+            connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при конкурентных чтениях '
+        'и записях отзывов в профилях базы данных development и production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5.0,
+            help='Длительность прогона каждого профиля, с.',
+        )
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=5.0,
+            help='Ожидание блокировки драйвером sqlite3, с.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для сохранения результатов в формате JSON.',
+        )
+
+    def prepare(self, options) -> None:
+        """Создает схему миграциями и заполняет произведения."""
+        call_command(
+            'migrate',
+            database=BENCHMARK_DATABASE,
+            interactive=False,
+            verbosity=0,
+        )
+        Title.objects.using(BENCHMARK_DATABASE).bulk_create(
+            Title(name=f'Title {pk}', year=2000)
+            for pk in range(1, options['titles'] + 1)
+        )
+        connections[BENCHMARK_DATABASE].close()
+
+    def run_profile(self, profile: str, options) -> Dict[str, float]:
+        """Прогон на временной базе с настройками профиля.
+
+        Соединения открываются через django.db.connections, поэтому
+        PRAGMA профиля выполняет обработчик configure_sqlite, а время
+        жизни соединения задает CONN_MAX_AGE профиля.
+        """
+        config = settings.DATABASE_PROFILES[profile]
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            DATABASE_PROFILE=profile,
+            SQLITE_PRAGMAS=config['SQLITE_PRAGMAS'],
+        ):
+            connections.databases[BENCHMARK_DATABASE] = {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(directory, 'benchmark.sqlite3'),
+                'CONN_MAX_AGE': config['CONN_MAX_AGE'],
+                'OPTIONS': {'timeout': options['timeout']},
+            }
+            try:
+                self.prepare(options)
+                workers: List[Worker] = [
+                    Worker(False, number, options)
+                    for number in range(options['readers'])
+                ] + [
+                    Worker(True, number, options)
+                    for number in range(options['writers'])
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            finally:
+                connections[BENCHMARK_DATABASE].close()
+                del connections[BENCHMARK_DATABASE]
+                del connections.databases[BENCHMARK_DATABASE]
+        duration: float = options['duration']
+        return {
+            'reads_per_second': round(sum(
+                worker.operations for worker in workers if not worker.writer
+            ) / duration, 1),
+            'writes_per_second': round(sum(
+                worker.operations for worker in workers if worker.writer
+            ) / duration, 1),
+            'locked_errors': sum(worker.errors for worker in workers),
+        }
+
+    def handle(self, *args, **options):
+        results: Dict[str, Dict[str, float]] = {}
+        for profile in settings.DATABASE_PROFILES:
+            results[profile] = self.run_profile(profile, options)
+            self.stdout.write(
+                f'{profile}: чтений/с {results[profile]["reads_per_second"]}, '
+                f'записей/с {results[profile]["writes_per_second"]}, '
+                f'ошибок блокировки {results[profile]["locked_errors"]}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2)
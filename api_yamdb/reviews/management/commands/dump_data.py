@@ -0,0 +1,140 @@
+import csv
+import gzip
+import os
+from typing import Dict, Tuple
+
+from django.core.management import BaseCommand
+from django.db.models import Model
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+DEFAULT_CHUNK_SIZE: int = 2000
+
+# Файл: модель и пары (заголовок колонки, поле для values_list).
+data_from_database: Dict[str, Tuple[Model, Tuple[Tuple[str, str], ...]]] = {
+    'category.csv': (
+        Category, (('id', 'id'), ('name', 'name'), ('slug', 'slug')),
+    ),
+    'genre.csv': (
+        Genre, (('id', 'id'), ('name', 'name'), ('slug', 'slug')),
+    ),
+    'users.csv': (
+        User,
+        (
+            ('id', 'id'),
+            ('username', 'username'),
+            ('email', 'email'),
+            ('role', 'role'),
+            ('bio', 'bio'),
+            ('first_name', 'first_name'),
+            ('last_name', 'last_name'),
+        ),
+    ),
+    'titles.csv': (
+        Title,
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('year', 'year'),
+            ('category', 'category_id'),
+            ('description', 'description'),
+        ),
+    ),
+    'genre_title.csv': (
+        Title.genre.through,
+        (('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id')),
+    ),
+    'review.csv': (
+        Review,
+        (
+            ('id', 'id'),
+            ('title_id', 'title_id'),
+            ('text', 'text'),
+            ('author', 'author_id'),
+            ('score', 'score'),
+            ('pub_date', 'pub_date'),
+        ),
+    ),
+    'comments.csv': (
+        Comment,
+        (
+            ('id', 'id'),
+            ('review_id', 'review_id'),
+            ('text', 'text'),
+            ('author', 'author_id'),
+            ('pub_date', 'pub_date'),
+        ),
+    ),
+}
+
+
+def to_csv_value(value) -> str:
+    """Значение поля в формате CSV-файлов load_data."""
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class Command(BaseCommand):
+    help = 'Выгружает базу данных в CSV-файлы формата команды load_data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            required=True,
+            help=(
+                'Каталог для CSV-файлов. Файлы в каталоге перезаписываются, '
+                'поэтому исходные данные из static/data по умолчанию '
+                'не используются.'
+            ),
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, получаемых из базы данных за один раз.',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы (*.csv.gz).',
+        )
+
+    def dump_file(self, file_name: str, db_model: Model, columns, options):
+        """Построчно выгружает модель в файл, возвращает число строк."""
+        path: str = os.path.join(options['path'], file_name)
+        if options['gzip']:
+            data_file = gzip.open(
+                f'{path}.gz', 'wt', encoding='utf-8', newline=''
+            )
+        else:
+            data_file = open(path, 'w', encoding='utf-8', newline='')
+        dumped: int = 0
+        with data_file:
+            writer = csv.writer(data_file, delimiter=',', quotechar='"')
+            writer.writerow([header for header, _ in columns])
+            rows = db_model.objects.order_by('pk').values_list(
+                *(field for _, field in columns)
+            ).iterator(chunk_size=options['chunk_size'])
+            for row in rows:
+                writer.writerow([to_csv_value(value) for value in row])
+                dumped += 1
+        return dumped
+
+    def handle(self, *args, **options):
+        os.makedirs(options['path'], exist_ok=True)
+        for file_name, (db_model, columns) in data_from_database.items():
+            dumped: int = self.dump_file(
+                file_name, db_model, columns, options
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Файл {file_name}: выгружено строк {dumped}'
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS('Выгрузка завершена успешно!')
+        )
@@ -0,0 +1,285 @@
+import random
+import time
+from datetime import date
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Model
+
+from api.cache import bump_model_version
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+WORDS: List[str] = [
+    'книга', 'фильм', 'песня', 'сюжет', 'герой', 'финал', 'автор',
+    'отлично', 'скучно', 'неожиданно', 'сильно', 'слабо', 'красиво',
+    'рекомендую', 'пересмотрю', 'спорно', 'атмосфера', 'музыка',
+]
+SCORE_WEIGHTS: List[int] = [2, 1, 2, 3, 5, 8, 12, 14, 10, 6]
+MAX_GENRES_PER_TITLE: int = 3
+
+
+def skewed_counts(
+    total: int,
+    size: int,
+    skew: float,
+    limit: Optional[int] = None,
+) -> Iterator[int]:
+    """Распределяет total элементов по size позициям по закону Ципфа.
+
+    Позиция с рангом r получает долю, пропорциональную 1 / r ** skew.
+    Дробные остатки и превышение limit переносятся на следующие позиции,
+    поэтому распределение детерминировано и не требует хранить веса.
+    """
+    norm: float = sum(rank ** -skew for rank in range(1, size + 1))
+    carry: float = 0.0
+    for rank in range(1, size + 1):
+        expected: float = total * rank ** -skew / norm + carry
+        count: int = round(expected) if rank == size else int(expected)
+        if limit is not None:
+            count = min(count, limit)
+        carry = expected - count
+        yield count
+
+
+def get_next_pk(model: Model) -> int:
+    """Первый свободный первичный ключ модели."""
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу данных воспроизводимым синтетическим набором '
+        'данных заданного размера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел.',
+        )
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help=(
+                'Показатель распределения Ципфа: чем больше, тем большая '
+                'часть отзывов и комментариев приходится на немногие '
+                'произведения и отзывы.'
+            ),
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.BULK_CREATE_BATCH_SIZE,
+            help='Количество объектов в одном INSERT-запросе.',
+        )
+
+    def insert(self, db_model: Model, objects: Iterable[Model]) -> int:
+        """Записывает объекты пакетами в одной транзакции."""
+        started: float = time.monotonic()
+        objects = iter(objects)
+        created: int = 0
+        with transaction.atomic():
+            batch = list(islice(objects, self.batch_size))
+            while batch:
+                db_model.objects.bulk_create(batch)
+                created += len(batch)
+                batch = list(islice(objects, self.batch_size))
+        elapsed: float = time.monotonic() - started
+        self.stdout.write(
+            f'{db_model._meta.db_table}: создано строк {created} '
+            f'({created / elapsed if elapsed else created:.0f} строк/с)'
+        )
+        return created
+
+    def get_text(self, words: int) -> str:
+        return ' '.join(self.rng.choices(WORDS, k=words)).capitalize()
+
+    def generate_groups(
+        self,
+        db_model: Model,
+        prefix: str,
+        first_pk: int,
+        count: int,
+    ) -> Iterator[Model]:
+        for pk in range(first_pk, first_pk + count):
+            group = db_model(
+                pk=pk,
+                name=f'{prefix} {pk}',
+                slug=f'{db_model._meta.model_name}-{pk}',
+            )
+            group.set_search_fields()
+            yield group
+
+    def generate_users(self, first_pk: int, count: int) -> Iterator[User]:
+        for pk in range(first_pk, first_pk + count):
+            user = User(
+                pk=pk,
+                username=f'user{pk}',
+                email=f'user{pk}@example.com',
+                password=UNUSABLE_PASSWORD_PREFIX,
+                bio=self.get_text(5),
+            )
+            user.set_search_fields()
+            yield user
+
+    def generate_titles(
+        self,
+        first_pk: int,
+        count: int,
+        categories: range,
+    ) -> Iterator[Title]:
+        last_year: int = date.today().year
+        for pk in range(first_pk, first_pk + count):
+            yield Title(
+                pk=pk,
+                name=f'{self.get_text(2)} {pk}',
+                year=self.rng.randint(1900, last_year),
+                description=self.get_text(12),
+                category_id=self.rng.choice(categories),
+            )
+
+    def generate_genre_titles(
+        self,
+        titles: range,
+        genres: range,
+    ) -> Iterator[Model]:
+        for title_id in titles:
+            count: int = self.rng.randint(
+                1, min(MAX_GENRES_PER_TITLE, len(genres))
+            )
+            for genre_id in self.rng.sample(genres, count):
+                yield Title.genre.through(title_id=title_id, genre_id=genre_id)
+
+    def generate_reviews(
+        self,
+        first_pk: int,
+        titles: range,
+        authors: range,
+        options,
+    ) -> Iterator[Review]:
+        """Отзывы: немногие популярные произведения получают большую часть.
+
+        Популярность назначается случайной перестановкой произведений,
+        а авторы внутри произведения не повторяются.
+        """
+        ranked: List[int] = list(titles)
+        self.rng.shuffle(ranked)
+        counts = skewed_counts(
+            options['reviews'], len(ranked), options['skew'], len(authors)
+        )
+        pk: int = first_pk
+        for title_id, count in zip(ranked, counts):
+            for author_id in self.rng.sample(authors, count):
+                yield Review(
+                    pk=pk,
+                    title_id=title_id,
+                    author_id=author_id,
+                    text=self.get_text(10),
+                    score=self.rng.choices(
+                        Review.ScoreChoice.values, SCORE_WEIGHTS
+                    )[0],
+                )
+                pk += 1
+
+    def generate_comments(
+        self,
+        first_pk: int,
+        reviews: range,
+        authors: range,
+        options,
+    ) -> Iterator[Comment]:
+        counts = skewed_counts(options['comments'], len(reviews),
+                               options['skew'])
+        pk: int = first_pk
+        for review_id, count in zip(reviews, counts):
+            for _ in range(count):
+                yield Comment(
+                    pk=pk,
+                    review_id=review_id,
+                    author_id=self.rng.choice(authors),
+                    text=self.get_text(6),
+                )
+                pk += 1
+
+    def check_options(self, options) -> None:
+        for name in ('users', 'categories', 'genres', 'titles'):
+            if options[name] < 1:
+                raise CommandError(f'Параметр --{name} должен быть больше 0.')
+        for name in ('reviews', 'comments'):
+            if options[name] < 0:
+                raise CommandError(
+                    f'Параметр --{name} не может быть отрицательным.'
+                )
+        if options['reviews'] > options['users'] * options['titles']:
+            raise CommandError(
+                'Каждый пользователь оставляет не больше одного отзыва '
+                'на произведение: уменьшите --reviews или увеличьте '
+                '--users и --titles.'
+            )
+
+    def handle(self, *args, **options):
+        self.check_options(options)
+        self.rng = random.Random(options['seed'])
+        self.batch_size: int = options['batch_size']
+
+        first_pk: int = get_next_pk(User)
+        users = range(first_pk, first_pk + options['users'])
+        self.insert(User, self.generate_users(first_pk, options['users']))
+
+        first_pk = get_next_pk(Category)
+        categories = range(first_pk, first_pk + options['categories'])
+        self.insert(Category, self.generate_groups(
+            Category, 'Категория', first_pk, options['categories']
+        ))
+
+        first_pk = get_next_pk(Genre)
+        genres = range(first_pk, first_pk + options['genres'])
+        self.insert(Genre, self.generate_groups(
+            Genre, 'Жанр', first_pk, options['genres']
+        ))
+
+        first_pk = get_next_pk(Title)
+        titles = range(first_pk, first_pk + options['titles'])
+        self.insert(
+            Title, self.generate_titles(first_pk, options['titles'],
+                                        categories)
+        )
+        self.insert(
+            Title.genre.through, self.generate_genre_titles(titles, genres)
+        )
+
+        first_pk = get_next_pk(Review)
+        created: int = self.insert(
+            Review,
+            self.generate_reviews(first_pk, titles, users, options),
+        )
+        reviews = range(first_pk, first_pk + created)
+
+        first_pk = get_next_pk(Comment)
+        self.insert(
+            Comment,
+            self.generate_comments(first_pk, reviews, users, options),
+        )
+
+        Title.objects.filter(
+            pk__range=(titles.start, titles.stop - 1)
+        ).update_rating()
+        for db_model in (User, Category, Genre, Title, Review, Comment):
+            bump_model_version(db_model)
+        self.stdout.write(
+            self.style.SUCCESS('Синтетические данные успешно созданы!')
+        )
@@ -1,77 +1,515 @@
-import csv
+import multiprocessing
 import os
 import sys
-from typing import Dict
+import tempfile
+import time
+from collections import deque
+from typing import (Deque, Dict, Iterable, Iterator, List, Optional, Set,
+                    Tuple)
 
 from django.conf import settings
 from django.core.management import BaseCommand
-from django.db import IntegrityError
-from django.db.models import Model
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Field, Model
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from api.cache import bump_model_version
+from reviews.importing import (ChunkTask, ParsedChunk, Row, get_insert_fields,
+                               init_worker, open_data_file, parse_chunk,
+                               read_chunks, read_header, save_known_keys,
+                               split_file)
+from reviews.models import (Category, Comment, Genre, ImportRowState, Review,
+                            Title)
 from users.models import User
 
-DATA_DIRECTORY: str = settings.DATA_FILE_PATH
-os.chdir(DATA_DIRECTORY)
+PK_BATCH_SIZE: int = 900
+DEFAULT_CHUNK_SIZE: int = 10000
+WORKER_TASKS_AHEAD: int = 2
 
 data_for_database: Dict[Model, str] = {
     Category: ('category.csv', ''),
     Genre: ('genre.csv', ''),
     User: ('users.csv', ''),
     Title: ('titles.csv', {'category': Category}),
-    Review: ('review.csv', {'author': User}),
-    Comment: ('comments.csv', {'author': User}),
+    Title.genre.through: (
+        'genre_title.csv', {'title_id': Title, 'genre_id': Genre}
+    ),
+    Review: ('review.csv', {'title_id': Title, 'author': User}),
+    Comment: ('comments.csv', {'review_id': Review, 'author': User}),
 }
 
 
+def fetch_existing_pks(model: Model, keys: Iterable[str]) -> Set[str]:
+    """Первичные ключи из keys, для которых есть записи в модели.
+
+    Ключи запрашиваются пакетами, не превышающими лимит параметров SQLite.
+    """
+    keys: List[str] = list(keys)
+    existing: Set[str] = set()
+    for start in range(0, len(keys), PK_BATCH_SIZE):
+        existing.update(
+            str(pk) for pk in model.objects.filter(
+                pk__in=keys[start:start + PK_BATCH_SIZE]
+            ).values_list('pk', flat=True)
+        )
+    return existing
+
+
+class RowWriter:
+    """Записывает готовые строки файла в таблицу модели.
+
+    Строки подготовлены процессами-обработчиками (parse_chunk), поэтому
+    запись пакета - один executemany с INSERT, без создания объектов
+    модели и проверки внешних ключей.
+    """
+
+    def __init__(self, db_model: Model, fields: List[Field]):
+        self.db_model: Model = db_model
+        self.fields: List[Field] = fields
+        self.connection = connections[router.db_for_write(db_model)]
+        quote = self.connection.ops.quote_name
+        self.sql: str = (
+            f'INSERT INTO {quote(db_model._meta.db_table)} '
+            f'({", ".join(quote(field.column) for field in fields)}) '
+            f'VALUES ({", ".join(["%s"] * len(fields))})'
+        )
+
+    def insert(self, rows: List[Row]) -> None:
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(self.sql, [values for _, values, _ in rows])
+
+    def build_objects(self, rows: List[Row]) -> List[Model]:
+        """Объекты модели из подготовленных значений строк.
+
+        Значения приводятся к типам Python конвертерами базы данных, как
+        при чтении объектов из нее.
+        """
+        table: str = self.db_model._meta.db_table
+        columns = [field.get_col(table) for field in self.fields]
+        converters = [
+            self.connection.ops.get_db_converters(column)
+            + column.get_db_converters(self.connection)
+            for column in columns
+        ]
+        attnames: List[str] = [field.attname for field in self.fields]
+        objects: List[Model] = []
+        for _, values, _ in rows:
+            python_values: List[object] = []
+            for column, value, column_converters in zip(
+                columns, values, converters
+            ):
+                for converter in column_converters:
+                    value = converter(value, column, self.connection)
+                python_values.append(value)
+            objects.append(self.db_model.from_db(
+                self.connection.alias, attnames, python_values
+            ))
+        return objects
+
+
+class RowStates:
+    """Контрольные суммы строк файла для загрузки в режиме --upsert.
+
+    Строка записывается, только если ее контрольная сумма изменилась или
+    соответствующей записи нет в базе данных. Записи, строк которых больше
+    нет в файле, удаляются после обработки всего файла; строки, которые
+    есть в файле, но пропущены из-за ошибок, записи не удаляют.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        writer: RowWriter,
+        update_fields: List[str],
+        batch_size: int,
+    ):
+        self.file_name: str = file_name
+        self.writer: RowWriter = writer
+        self.db_model: Model = writer.db_model
+        self.update_fields: List[str] = update_fields
+        self.batch_size: int = batch_size
+        self.seen: Set[str] = set()
+        self.stored: Dict[str, Tuple[int, str]] = {}
+        self.existing: Set[str] = set()
+        self.created: int = 0
+        self.updated: int = 0
+
+    def get_states(self):
+        return ImportRowState.objects.filter(file_name=self.file_name)
+
+    def keep(self, keys: Iterable[str]) -> None:
+        """Отмечает ключи пропущенных строк как присутствующие в файле."""
+        self.seen.update(keys)
+
+    def select_changed(self, rows: List[Row]) -> List[Row]:
+        """Оставляет новые и измененные строки пакета."""
+        keys: List[str] = [key for key, _, _ in rows]
+        self.seen.update(keys)
+        self.stored = {}
+        for start in range(0, len(keys), PK_BATCH_SIZE):
+            self.stored.update(
+                (row_key, (pk, checksum))
+                for pk, row_key, checksum in self.get_states().filter(
+                    row_key__in=keys[start:start + PK_BATCH_SIZE]
+                ).values_list('pk', 'row_key', 'checksum')
+            )
+        self.existing = fetch_existing_pks(self.db_model, keys)
+        changed: List[Row] = []
+        for row in rows:
+            key, _, checksum = row
+            stored = self.stored.get(key)
+            if key in self.existing and stored and stored[1] == checksum:
+                continue
+            changed.append(row)
+        return changed
+
+    def save(self, rows: List[Row]) -> None:
+        """Создает новые записи, обновляет существующие и их состояния.
+
+        Новые строки записываются через RowWriter.insert, а измененные -
+        через bulk_update, минующий save() и post_save: для пользователей
+        UserQuerySet.bulk_update сам увеличивает версию токенов при смене
+        прав и сбрасывает кэш аутентификации.
+        """
+        to_create: List[Row] = []
+        to_update: List[Row] = []
+        for row in rows:
+            if row[0] in self.existing:
+                to_update.append(row)
+            else:
+                to_create.append(row)
+        self.writer.insert(to_create)
+        if to_update:
+            self.db_model.objects.bulk_update(
+                self.writer.build_objects(to_update),
+                self.update_fields,
+                batch_size=self.batch_size,
+            )
+        self.created += len(to_create)
+        self.updated += len(to_update)
+
+        new_states: List[ImportRowState] = []
+        changed_states: List[ImportRowState] = []
+        for key, _, checksum in rows:
+            state = ImportRowState(
+                file_name=self.file_name,
+                row_key=key,
+                checksum=checksum,
+            )
+            if key in self.stored:
+                state.pk = self.stored[key][0]
+                changed_states.append(state)
+            else:
+                new_states.append(state)
+        ImportRowState.objects.bulk_create(
+            new_states, batch_size=self.batch_size
+        )
+        ImportRowState.objects.bulk_update(
+            changed_states, ['checksum'], batch_size=self.batch_size
+        )
+
+    def delete_missing(self) -> int:
+        """Удаляет записи, строк которых больше нет в файле."""
+        missing: List[str] = [
+            key for key in self.get_states().values_list(
+                'row_key', flat=True
+            ).iterator()
+            if key not in self.seen
+        ]
+        for start in range(0, len(missing), PK_BATCH_SIZE):
+            keys: List[str] = missing[start:start + PK_BATCH_SIZE]
+            self.db_model.objects.filter(pk__in=keys).delete()
+            self.get_states().filter(row_key__in=keys).delete()
+        return len(missing)
+
+
 class Command(BaseCommand):
-    def handle(self, *args, **kwargs):
-        for db_model, file_and_args in data_for_database.items():
-            try:
-                with open(
-                    file_and_args[0], 'r', encoding='utf-8'
-                ) as data_file:
-                    objects_queue = []
-                    reader = csv.DictReader(
-                        data_file,
-                        delimiter=',',
-                        quotechar='"',
-                        skipinitialspace=True,
-                    )
-                    for row in reader:
-                        data_args: Dict[str, str] = dict(**row)
-                        if file_and_args[1]:
-                            for key, value in file_and_args[1].items():
-                                data_args[key] = value.objects.get(
-                                    pk=data_args[key]
-                                )
-                        objects_queue.append(db_model(**data_args))
-                    db_model.objects.bulk_create(objects_queue)
-
-            except FileNotFoundError:
+    help = 'Загружает данные из CSV-файлов в базу данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=settings.DATA_FILE_PATH,
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых из файла за один раз.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.BULK_CREATE_BATCH_SIZE,
+            help=(
+                'Количество объектов в одном запросе bulk_update '
+                'в режиме --upsert.'
+            ),
+        )
+        parser.add_argument(
+            '--resume-from',
+            metavar='FILE',
+            help='Начать загрузку с указанного файла, пропустив предыдущие.',
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=(
+                'Загрузить только изменения: по контрольным суммам строк '
+                'добавить новые, обновить измененные и удалить пропавшие '
+                'из файлов записи.'
+            ),
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=(
+                'Количество процессов, которые читают, проверяют и готовят '
+                'к записи пакеты строк. Записывает данные в базу всегда '
+                'один процесс.'
+            ),
+        )
+
+    def load_file(
+        self,
+        db_model: Model,
+        file_name: str,
+        foreign_keys: Dict[str, Model],
+        pool,
+        keys_dir: str,
+        options,
+    ) -> int:
+        """Записывает пакеты файла в одной транзакции.
+
+        Строки пакетов готовят к записи процессы пула (если он есть):
+        ключи связанных моделей сохраняются для них в keys_dir до начала
+        транзакции. Возвращает количество загруженных строк.
+        """
+        file_path: str = os.path.join(options['path'], file_name)
+        fieldnames: List[str] = read_header(file_path)
+        keys_path: Optional[str] = None
+        if foreign_keys:
+            keys_path = os.path.join(keys_dir, f'{file_name}.keys')
+            save_known_keys(keys_path, db_model, foreign_keys)
+        task = ChunkTask(
+            options['path'],
+            file_name,
+            db_model._meta.label,
+            list(foreign_keys),
+            fieldnames,
+            keys_path,
+        )
+        tasks: Iterator[ChunkTask] = self.get_tasks(
+            task, options, split=pool is not None
+        )
+        if pool is not None:
+            parsed_chunks: Iterable[ParsedChunk] = self.parse_in_pool(
+                pool, tasks, options['workers'] * WORKER_TASKS_AHEAD
+            )
+        else:
+            parsed_chunks = map(parse_chunk, tasks)
+
+        writer = RowWriter(db_model, get_insert_fields(db_model, fieldnames))
+        states: Optional[RowStates] = None
+        if options['upsert']:
+            states = RowStates(
+                file_name,
+                writer,
+                self.get_update_fields(db_model, fieldnames),
+                options['batch_size'],
+            )
+        loaded: int = 0
+        started: float = time.monotonic()
+        with transaction.atomic(using=writer.connection.alias):
+            for rows, messages, rejected in parsed_chunks:
+                for message in messages:
+                    self.stdout.write(self.style.WARNING(message))
+                if states is None:
+                    writer.insert(rows)
+                else:
+                    states.keep(rejected)
+                    rows = states.select_changed(rows)
+                    states.save(rows)
+                loaded += len(rows)
+                self.report_progress(file_name, loaded, started)
+            if states is not None:
+                deleted: int = states.delete_missing()
                 self.stdout.write(
-                    self.style.ERROR(
-                        f'Файла {file_and_args[0]} нет в рабочем каталоге!'
-                        '\nРабота загрузчика прервана!'
-                    )
+                    f'{file_name}: добавлено {states.created}, '
+                    f'обновлено {states.updated}, удалено {deleted}'
                 )
-                sys.exit()
-            except IntegrityError:
-                self.stdout.write(
-                    self.style.ERROR(
-                        f'Oшибка при работе с файлом{file_and_args[0]}'
-                        '\nРабота загрузчика прервана!'
-                    )
+        return loaded
+
+    @staticmethod
+    def get_update_fields(
+        db_model: Model,
+        fieldnames: Iterable[str],
+    ) -> List[str]:
+        """Поля, обновляемые в режиме --upsert: колонки файла и поиск."""
+        pk_column: str = db_model._meta.pk.attname
+        fields: List[str] = [
+            db_model._meta.get_field(column).name for column in fieldnames
+            if db_model._meta.get_field(column).attname != pk_column
+        ]
+        fields.extend(getattr(db_model, 'SEARCH_FIELDS', ()))
+        return fields
+
+    def report_progress(
+        self,
+        file_name: str,
+        loaded: int,
+        started: float,
+    ) -> None:
+        """Выводит количество загруженных строк и скорость загрузки."""
+        elapsed: float = time.monotonic() - started
+        rate: float = loaded / elapsed if elapsed else 0.0
+        self.stdout.write(
+            f'{file_name}: загружено строк {loaded} ({rate:.0f} строк/с)'
+        )
+
+    def get_queue(self, resume_from: Optional[str]):
+        """Файлы для загрузки с учетом параметра --resume-from."""
+        queue = list(data_for_database.items())
+        if resume_from is None:
+            return queue
+        file_names: List[str] = [
+            file_and_args[0] for _, file_and_args in queue
+        ]
+        if resume_from not in file_names:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'Файл {resume_from} не входит в список загрузки: '
+                    f'{", ".join(file_names)}'
+                    '\nРабота загрузчика прервана!'
                 )
-                sys.exit()
-            else:
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'Данные из файла {file_and_args[0]} успешно загружены'
-                    )
+            )
+            sys.exit(1)
+        return queue[file_names.index(resume_from):]
+
+    def get_tasks(
+        self,
+        task: ChunkTask,
+        options,
+        split: bool,
+    ) -> Iterator[ChunkTask]:
+        """Задачи разбора пакетов файла.
+
+        Для пула процессов обычный файл делится на пакеты по смещениям,
+        и каждый процесс читает свой пакет сам; в остальных случаях строки
+        пакетов читаются в текущем процессе.
+        """
+        file_path: str = os.path.join(task.path, task.file_name)
+        if split and os.path.exists(file_path):
+            for offset, length, first_line in split_file(
+                file_path, options['chunk_size']
+            ):
+                yield task._replace(
+                    offset=offset, length=length, first_line=first_line
+                )
+            return
+        with open_data_file(file_path) as data_file:
+            for rows in read_chunks(data_file, options['chunk_size']):
+                yield task._replace(rows=rows)
+
+    @staticmethod
+    def parse_in_pool(
+        pool,
+        tasks: Iterable[ChunkTask],
+        ahead: int,
+    ) -> Iterator[ParsedChunk]:
+        """Разбирает пакеты в пуле процессов, сохраняя их порядок.
+
+        В работе одновременно не больше ahead задач, поэтому обработчики
+        не опережают запись в базу данных больше чем на несколько пакетов.
+        """
+        pending: Deque = deque()
+        for task in tasks:
+            pending.append(pool.apply_async(parse_chunk, (task, )))
+            if len(pending) > ahead:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def handle(self, *args, **options):
+        queue = self.get_queue(options['resume_from'])
+        pool = None
+        if options['workers'] > 1:
+            # Процессы создаются методом spawn: fork недоступен в Windows
+            # и небезопасен в macOS.
+            pool = multiprocessing.get_context('spawn').Pool(
+                options['workers'], initializer=init_worker
+            )
+        try:
+            self.load_queue(queue, pool, options)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+    def load_queue(self, queue, pool, options):
+        """Записывает файлы в базу данных в порядке зависимостей.
+
+        Пакеты строк готовят к записи процессы пула (если он есть), а
+        записывает их в базу данных всегда текущий процесс.
+        """
+        with tempfile.TemporaryDirectory() as keys_dir:
+            for db_model, file_and_args in queue:
+                self.load_file_or_exit(
+                    db_model, file_and_args, pool, keys_dir, options
                 )
+        Title.objects.all().update_rating()
+        for db_model in data_for_database:
+            bump_model_version(db_model)
         self.stdout.write(
             self.style.SUCCESS(
                 'Работа загрузчика завершена успешно!'
             )
         )
+
+    def load_file_or_exit(
+        self,
+        db_model: Model,
+        file_and_args,
+        pool,
+        keys_dir: str,
+        options,
+    ) -> None:
+        """Загружает файл, при ошибке прерывает работу загрузчика."""
+        file_name, foreign_keys = file_and_args
+        try:
+            self.load_file(
+                db_model,
+                file_name,
+                foreign_keys or {},
+                pool,
+                keys_dir,
+                options,
+            )
+        except FileNotFoundError:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'Файла {file_name} нет в каталоге '
+                    f'{options["path"]}!'
+                    '\nРабота загрузчика прервана!'
+                )
+            )
+            sys.exit(1)
+        except IntegrityError:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'Oшибка при работе с файлом {file_name}, '
+                    'изменения из файла отменены.'
+                    '\nРабота загрузчика прервана! Продолжить можно '
+                    f'с параметром --resume-from {file_name}'
+                )
+            )
+            sys.exit(1)
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Данные из файла {file_name} успешно загружены'
+                )
+            )
@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг и количество отзывов всех произведений.'
+
+    def handle(self, *args, **kwargs):
+        updated: int = Title.objects.all().update_rating()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Рейтинг пересчитан для произведений: {updated}'
+            )
+        )
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews.fts import drop_title_fts, install_title_fts
+
+
+def create_fts(apps, schema_editor):
+    install_title_fts(schema_editor.connection)
+
+
+def drop_fts(apps, schema_editor):
+    drop_title_fts(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating_reviews_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRowState',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=100, verbose_name='Файл')),
+                ('row_key', models.CharField(max_length=64, verbose_name='Первичный ключ строки')),
+                ('checksum', models.CharField(max_length=32, verbose_name='Контрольная сумма')),
+            ],
+            options={
+                'verbose_name': 'Состояние загрузки строки',
+                'verbose_name_plural': 'Состояния загрузки строк',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='importrowstate',
+            constraint=models.UniqueConstraint(fields=('file_name', 'row_key'), name='unique_import_row'),
+        ),
+    ]
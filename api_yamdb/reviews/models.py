@@ -1,7 +1,15 @@
+import re
+from typing import List
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import connection, models
+from django.db.models import Avg, Count, OuterRef, Q, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
+from .fts import FTS_TABLE
 from .validators import validate_year
 
 User = get_user_model()
@@ -19,6 +27,13 @@ class UnitedGenreCategory(models.Model):
         max_length=settings.LIMIT_SLUG_LENGHT,
         unique=True
     )
+    name_search = models.CharField(
+        'Название для поиска',
+        max_length=settings.LIMIT_NAME_LENGHT,
+        db_index=True,
+        editable=False,
+        default='',
+    )
 
     class Meta:
         abstract = True
@@ -28,6 +43,16 @@ class UnitedGenreCategory(models.Model):
         """Строковое представление."""
         return self.name
 
+    SEARCH_FIELDS = ('name_search', )
+
+    def set_search_fields(self):
+        """Заполняет нормализованное для поиска название."""
+        self.name_search = self.name.casefold()
+
+    def save(self, *args, **kwargs):
+        self.set_search_fields()
+        super().save(*args, **kwargs)
+
 
 class Category(UnitedGenreCategory):
     """Модель категории произведения."""
@@ -45,6 +70,65 @@ class Genre(UnitedGenreCategory):
         verbose_name_plural = 'Жанры'
 
 
+class TitleQuerySet(models.QuerySet):
+    """Набор запросов для модели произведения."""
+
+    FTS_MATCH_SQL: str = (
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+    )
+    FTS_RANK_SQL: str = (
+        f'SELECT bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = reviews_title.id'
+    )
+
+    @staticmethod
+    def fts_query(text: str) -> str:
+        """Запрос FTS5: все слова из текста как префиксы в кавычках."""
+        words: List[str] = re.findall(r'\w+', text)
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def search(self, text: str):
+        """Полнотекстовый поиск по названию и описанию.
+
+        В SQLite используется индекс FTS5 с ранжированием по bm25,
+        для остальных СУБД - поиск подстроки без учета регистра.
+        """
+        query: str = self.fts_query(text)
+        if not query:
+            return self.none()
+        if connection.vendor != 'sqlite':
+            return self.filter(
+                Q(name__icontains=text) | Q(description__icontains=text)
+            )
+        return self.filter(
+            pk__in=RawSQL(self.FTS_MATCH_SQL, (query, ))
+        ).annotate(
+            search_rank=RawSQL(self.FTS_RANK_SQL, (query, ))
+        ).order_by('search_rank', 'pk')
+
+    def update_rating(self):
+        """Пересчитывает сохраненные рейтинг и количество отзывов.
+
+        Выполняется одним UPDATE-запросом с коррелированными подзапросами,
+        поэтому значения обновляются атомарно на уровне базы данных.
+        Дата изменения произведения также обновляется: от нее зависят
+        валидаторы условных запросов к произведению и его отзывам.
+        """
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            updated_at=timezone.now(),
+            rating=Subquery(
+                reviews.annotate(value=Avg('score')).values('value')
+            ),
+            reviews_count=Coalesce(
+                Subquery(reviews.annotate(value=Count('pk')).values('value')),
+                0,
+            ),
+        )
+
+
 class Title(models.Model):
     """Модель произведения."""
 
@@ -57,7 +141,8 @@ class Title(models.Model):
         validators=(validate_year,)
     )
     description = models.TextField(
-        'Описание'
+        'Описание',
+        blank=True,
     )
     genre = models.ManyToManyField(
         Genre,
@@ -72,6 +157,23 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         null=True,
     )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведения'
@@ -89,6 +191,9 @@ class BaseReviewsComments(models.Model):
     pub_date = models.DateTimeField(
         "Дата добавления", auto_now_add=True, db_index=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True
+    )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE,
     )
@@ -125,6 +230,12 @@ class Review(BaseReviewsComments):
     class Meta(BaseReviewsComments.Meta):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -143,3 +254,40 @@ class Comment(BaseReviewsComments):
     class Meta(BaseReviewsComments.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
+
+
+class ImportRowState(models.Model):
+    """Контрольная сумма строки, загруженной командой load_data."""
+
+    file_name = models.CharField(
+        'Файл',
+        max_length=settings.LIMIT_IMPORT_FILE_NAME_LENGTH,
+    )
+    row_key = models.CharField(
+        'Первичный ключ строки',
+        max_length=settings.LIMIT_IMPORT_ROW_KEY_LENGTH,
+    )
+    checksum = models.CharField(
+        'Контрольная сумма',
+        max_length=settings.LIMIT_IMPORT_CHECKSUM_LENGTH,
+    )
+
+    class Meta:
+        verbose_name = 'Состояние загрузки строки'
+        verbose_name_plural = 'Состояния загрузки строк'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['file_name', 'row_key'],
+                name='unique_import_row',
+            ),
+        ]
+
+    def __str__(self):
+        """Строковое представление."""
+        return f'{self.file_name}:{self.row_key}'
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .fts import install_title_fts
+from .models import Review, Title
+from .sqlite import apply_pragmas
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def update_title_rating(sender, instance, using, **kwargs):
+    """Обновляет рейтинг произведения при изменении его отзывов."""
+    Title.objects.using(using).filter(pk=instance.title_id).update_rating()
+
+
+def restore_title_fts(sender, using='default', **kwargs):
+    """Восстанавливает триггеры FTS5 после пересоздания таблицы миграцией."""
+    install_title_fts(connections[using])
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Настраивает новое соединение SQLite по профилю базы данных."""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, settings.SQLITE_PRAGMAS)
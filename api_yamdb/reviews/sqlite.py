@@ -0,0 +1,13 @@
+from typing import Dict, Union
+
+PragmaValue = Union[int, str]
+
+
+def apply_pragmas(cursor, pragmas: Dict[str, PragmaValue]) -> None:
+    """Выполняет PRAGMA для открытого соединения SQLite.
+
+    Имена и значения берутся только из настроек проекта, поэтому
+    подставляются в запрос напрямую: PRAGMA не поддерживает параметры.
+    """
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,57 @@
+import time
+from smtplib import SMTPException
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from users.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди (таблицы OutboxEmail).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем, выбираемых из очереди за один раз.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Пауза между проверками очереди в режиме --loop, с.',
+        )
+
+    def drain(self, batch_size: int) -> None:
+        """Отправляет очередь; ошибка не останавливает режим --loop."""
+        try:
+            sent, failed = drain_outbox(batch_size)
+        except (SMTPException, OSError) as error:
+            self.stdout.write(
+                self.style.ERROR(f'Почтовый сервер недоступен: {error}')
+            )
+            return
+        except Exception as error:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'Ошибка отправки писем: {type(error).__name__}: {error}'
+                )
+            )
+            return
+        if sent or failed:
+            self.stdout.write(
+                f'Отправлено писем: {sent}, неудачных попыток: {failed}'
+            )
+
+    def handle(self, *args, **options):
+        self.drain(options['batch_size'])
+        while options['loop']:
+            time.sleep(options['interval'])
+            self.drain(options['batch_size'])
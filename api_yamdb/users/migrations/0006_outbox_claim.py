@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_manager'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='lock_token',
+            field=models.CharField(blank=True, max_length=32, verbose_name='Метка отправителя'),
+        ),
+        migrations.AddField(
+            model_name='outboxemail',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Время захвата отправителем'),
+        ),
+    ]
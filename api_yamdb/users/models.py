@@ -1,10 +1,128 @@
+from typing import Dict, Iterable, List, Set
+
 from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.contrib.auth.validators import UnicodeUsernameValidator
-from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 
+from users.signals import users_changed
 from users.validators import validate_username_not_me
 
+CLAIMS_BATCH_SIZE: int = 900
+
+
+class UserQuerySet(models.QuerySet):
+    """Набор запросов пользователей, учитывающий версию токенов.
+
+    Изменение полей прав доступа через update() и bulk_update() минует
+    User.save(), поэтому версия токенов увеличивается здесь же,
+    а об изменении пользователей сообщает сигнал users_changed.
+    """
+
+    def bump_token_version(self) -> int:
+        """Увеличивает версию токенов пользователей набора."""
+        user_ids: List[int] = list(self.values_list('pk', flat=True))
+        updated: int = super().update(token_version=F('token_version') + 1)
+        users_changed.send(
+            sender=self.model, user_ids=user_ids, fields=['token_version']
+        )
+        return updated
+
+    def update(self, **kwargs) -> int:
+        """Обновление, о котором сообщает сигнал users_changed.
+
+        Кэш аутентификации хранит пользователя целиком, поэтому сигнал
+        отправляется при изменении любых полей, в том числе is_active
+        и username. Идентификаторы выбираются до обновления: условие
+        набора может зависеть от изменяемого поля.
+        """
+        fields: List[str] = list(kwargs)
+        if (
+            'token_version' not in kwargs
+            and set(kwargs) & set(self.model.TOKEN_CLAIM_FIELDS)
+        ):
+            kwargs['token_version'] = F('token_version') + 1
+            fields.append('token_version')
+        with transaction.atomic(using=self.db):
+            user_ids: List[int] = list(self.values_list('pk', flat=True))
+            updated: int = super().update(**kwargs)
+            users_changed.send(
+                sender=self.model, user_ids=user_ids, fields=fields
+            )
+        return updated
+
+    def get_changed_claims(self, objs: List['User']) -> Set[int]:
+        """Идентификаторы объектов, права которых отличаются от базы."""
+        stored = {
+            pk: tuple(claims)
+            for pk, *claims in self.filter(
+                pk__in=[obj.pk for obj in objs]
+            ).values_list('pk', *self.model.TOKEN_CLAIM_FIELDS)
+        }
+        return {
+            obj.pk for obj in objs
+            if stored.get(obj.pk, obj.get_claim_values())
+            != obj.get_claim_values()
+        }
+
+    def bulk_update(
+        self,
+        objs: Iterable['User'],
+        fields: Iterable[str],
+        batch_size=None,
+    ) -> int:
+        """Пакетное обновление с увеличением версии токенов.
+
+        Версия увеличивается выражением F() только у пользователей,
+        права которых отличаются от сохраненных в базе данных.
+        """
+        objs = list(objs)
+        fields = list(fields)
+        if not set(fields) & set(self.model.TOKEN_CLAIM_FIELDS):
+            updated: int = super().bulk_update(objs, fields, batch_size)
+            users_changed.send(
+                sender=self.model,
+                user_ids=[obj.pk for obj in objs],
+                fields=fields,
+            )
+            return updated
+
+        batches: List[List['User']] = [
+            objs[start:start + CLAIMS_BATCH_SIZE]
+            for start in range(0, len(objs), CLAIMS_BATCH_SIZE)
+        ]
+        with transaction.atomic(using=self.db):
+            for batch in batches:
+                changed: Set[int] = self.get_changed_claims(batch)
+                for obj in batch:
+                    obj.token_version = (
+                        F('token_version') + int(obj.pk in changed)
+                    )
+            updated = super().bulk_update(
+                objs, [*fields, 'token_version'], batch_size
+            )
+            for batch in batches:
+                versions: Dict[int, int] = dict(self.filter(
+                    pk__in=[obj.pk for obj in batch]
+                ).values_list('pk', 'token_version'))
+                for obj in batch:
+                    obj.token_version = versions.get(obj.pk, 0)
+                    obj._loaded_claims = obj.get_claim_values()
+        users_changed.send(
+            sender=self.model,
+            user_ids=[obj.pk for obj in objs],
+            fields=[*fields, 'token_version'],
+        )
+        return updated
+
+
+class TokenVersionUserManager(UserManager.from_queryset(UserQuerySet)):
+    """Менеджер пользователей с набором запросов UserQuerySet."""
+
+    pass
+
 
 class User(AbstractUser):
     """Модель пользователя."""
@@ -44,6 +162,20 @@ class User(AbstractUser):
         default=UserRoles.USER,
     )
 
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        editable=False,
+    )
+
+    username_search = models.CharField(
+        'Имя пользователя для поиска',
+        max_length=settings.LIMIT_USERNAME_LENGTH,
+        db_index=True,
+        editable=False,
+        default='',
+    )
+
     @property
     def is_admin(self):
         """Пользователь имеет права администратора."""
@@ -74,3 +206,127 @@ class User(AbstractUser):
     def __str__(self) -> str:
         """Строковое представления пользователя."""
         return f'{self.username} ({self.role})'
+
+    SEARCH_FIELDS = ('username_search', )
+    TOKEN_CLAIM_FIELDS = ('role', 'is_staff', 'is_superuser')
+
+    objects = TokenVersionUserManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные из базы данных права доступа и имя."""
+        instance = super().from_db(db, field_names, values)
+        if all(
+            field in instance.__dict__ for field in cls.TOKEN_CLAIM_FIELDS
+        ):
+            instance._loaded_claims = instance.get_claim_values()
+        if 'username' in instance.__dict__:
+            instance._loaded_username = instance.username
+        return instance
+
+    def username_changed(self) -> bool:
+        """Изменено ли имя с момента загрузки из базы данных.
+
+        Для объекта, загруженного без имени, считается измененным.
+        """
+        return getattr(self, '_loaded_username', None) != self.username
+
+    def get_claim_values(self):
+        """Значения полей прав доступа, передаваемых в токене."""
+        return tuple(getattr(self, field) for field in self.TOKEN_CLAIM_FIELDS)
+
+    def get_token_claims(self):
+        """Утверждения о правах доступа для access-токена."""
+        return {
+            'token_version': self.token_version,
+            **{
+                field: getattr(self, field)
+                for field in self.TOKEN_CLAIM_FIELDS
+            },
+        }
+
+    def set_search_fields(self) -> None:
+        """Заполняет нормализованное для поиска имя пользователя."""
+        self.username_search = self.username.casefold()
+
+    def save(self, *args, **kwargs):
+        """Сохранение с увеличением версии токенов при смене прав.
+
+        Версия увеличивается выражением F() на стороне базы данных,
+        поэтому одновременные сохранения не теряют увеличений. Токены
+        с прежними значениями прав после этого отклоняются.
+        """
+        self.set_search_fields()
+        loaded_claims = getattr(self, '_loaded_claims', None)
+        bump: bool = (
+            loaded_claims is not None
+            and loaded_claims != self.get_claim_values()
+        )
+        if bump:
+            self.token_version = F('token_version') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'token_version'
+                }
+        super().save(*args, **kwargs)
+        if bump:
+            self.refresh_from_db(fields=('token_version', ))
+        self._loaded_claims = self.get_claim_values()
+        self._loaded_username = self.username
+
+
+class OutboxEmail(models.Model):
+    """Письмо, ожидающее отправки обработчиком очереди.
+
+    Запись создается в транзакции запроса, а отправляет письмо фоновый
+    поток или команда send_outbox, поэтому время ответа не зависит
+    от почтового сервера. Перед отправкой письмо захватывается
+    отправителем (locked_at, lock_token), чтобы его не отправили дважды.
+    """
+
+    subject = models.CharField(
+        'Тема',
+        max_length=settings.LIMIT_EMAIL_SUBJECT_LENGTH,
+    )
+    body = models.TextField('Текст письма')
+    from_email = models.EmailField(
+        'Отправитель',
+        max_length=settings.LIMIT_USER_EMAIL_LENGTH,
+    )
+    recipient = models.EmailField(
+        'Получатель',
+        max_length=settings.LIMIT_USER_EMAIL_LENGTH,
+    )
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Время следующей попытки',
+        default=timezone.now,
+    )
+    sent_at = models.DateTimeField('Дата отправки', null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField('Попыток отправки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    locked_at = models.DateTimeField(
+        'Время захвата отправителем',
+        null=True,
+        blank=True,
+    )
+    lock_token = models.CharField(
+        'Метка отправителя',
+        max_length=settings.LIMIT_OUTBOX_LOCK_TOKEN_LENGTH,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Письма в очереди'
+        ordering = ('pk', )
+        indexes = [
+            models.Index(
+                fields=['sent_at', 'next_attempt_at'],
+                name='outbox_pending',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Строковое представление письма."""
+        return f'{self.recipient}: {self.subject}'
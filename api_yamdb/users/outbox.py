@@ -0,0 +1,274 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from users.models import OutboxEmail
+
+RESEND_MARKER_KEY_PREFIX: str = 'signup-resend'
+
+logger = logging.getLogger(__name__)
+
+
+def get_resend_marker_key(username: str, email: str) -> str:
+    """Ключ отметки о недавно отправленном коде подтверждения."""
+    digest: str = hashlib.md5(f'{username}\n{email}'.encode()).hexdigest()
+    return f'{RESEND_MARKER_KEY_PREFIX}:{digest}'
+
+
+def is_resend_suppressed(username: str, email: str) -> bool:
+    """Код для этой пары username/email отправлялся в пределах окна."""
+    if not settings.SIGNUP_RESEND_WINDOW:
+        return False
+    cache = caches[settings.RESPONSE_CACHE_ALIAS]
+    return cache.get(get_resend_marker_key(username, email)) is not None
+
+
+def suppress_resend(username: str, email: str) -> None:
+    """Отмечает отправку кода после фиксации текущей транзакции.
+
+    Отметка хранится в кэше SIGNUP_RESEND_WINDOW секунд; повторная
+    регистрация в этом окне не создает и не отправляет новый код.
+    """
+    window: int = settings.SIGNUP_RESEND_WINDOW
+    if not window:
+        return
+    cache = caches[settings.RESPONSE_CACHE_ALIAS]
+    key: str = get_resend_marker_key(username, email)
+    transaction.on_commit(lambda: cache.set(key, True, window))
+
+
+def enqueue_email(
+    subject: str,
+    body: str,
+    from_email: str,
+    recipient: str,
+) -> OutboxEmail:
+    """Ставит письмо в очередь в текущей транзакции.
+
+    После фиксации транзакции письмо отправляет фоновый поток процесса
+    (режим доставки 'thread') или сам запрос ('on_commit'); в режиме
+    'worker' письмо ждет команду send_outbox.
+    """
+    email = OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipient=recipient,
+    )
+    delivery: str = settings.EMAIL_OUTBOX_DELIVERY
+    if delivery == 'thread':
+        transaction.on_commit(drainer.wake)
+    elif delivery == 'on_commit':
+        transaction.on_commit(lambda: send_emails(claim_emails([email.pk])))
+    return email
+
+
+class OutboxDrainer:
+    """Единственный фоновый поток процесса, отправляющий очередь писем.
+
+    Поток запускается при первом вызове wake() и отправляет все ожидающие
+    письма функцией drain_outbox: пакетами и через одно соединение,
+    сколько бы регистраций ни разбудило его за это время. Между вызовами
+    wake() поток проверяет очередь каждые EMAIL_OUTBOX_POLL_INTERVAL
+    секунд, поэтому отложенные после ошибки письма отправляются повторно
+    и без команды send_outbox.
+    """
+
+    def __init__(self) -> None:
+        self.wakeup: Event = Event()
+        self.stopped: Event = Event()
+        self.lock: Lock = Lock()
+        self.thread: Optional[Thread] = None
+
+    def wake(self) -> None:
+        """Будит поток (и запускает его, если он еще не работает)."""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.stopped.clear()
+                self.thread = Thread(
+                    target=self.run, name='outbox-drainer', daemon=True
+                )
+                self.thread.start()
+        self.wakeup.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Останавливает поток после текущей отправки."""
+        with self.lock:
+            thread: Optional[Thread] = self.thread
+            self.thread = None
+            self.stopped.set()
+            self.wakeup.set()
+        if thread is not None:
+            thread.join(timeout)
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            self.wakeup.wait(timeout=settings.EMAIL_OUTBOX_POLL_INTERVAL)
+            self.wakeup.clear()
+            if not self.stopped.is_set():
+                self.drain()
+
+    def drain(self) -> None:
+        """Отправляет очередь и закрывает соединения потока с базой.
+
+        Ошибка (например, блокировка базы данных при захвате) записывается
+        в журнал и не останавливает поток.
+        """
+        try:
+            drain_outbox(settings.EMAIL_OUTBOX_BATCH_SIZE)
+        except Exception:
+            logger.exception('Ошибка отправки писем из очереди')
+        finally:
+            connections.close_all()
+
+
+drainer = OutboxDrainer()
+
+
+def get_claimable_emails() -> QuerySet:
+    """Письма, не захваченные отправителем или захваченные слишком давно."""
+    stale: datetime = timezone.now() - timedelta(
+        seconds=settings.EMAIL_OUTBOX_LOCK_TIMEOUT
+    )
+    return OutboxEmail.objects.filter(
+        Q(locked_at__isnull=True) | Q(locked_at__lt=stale),
+        sent_at__isnull=True,
+    )
+
+
+def get_pending_emails() -> QuerySet:
+    """Неотправленные письма, для которых подошло время попытки."""
+    return get_claimable_emails().filter(
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+        next_attempt_at__lte=timezone.now(),
+    ).order_by('pk')
+
+
+def claim_emails(email_ids: Iterable[int]) -> List[OutboxEmail]:
+    """Захватывает письма для отправки одним условным UPDATE.
+
+    UPDATE выполняется атомарно, поэтому письмо достается только одному
+    отправителю (фоновому потоку, запросу или процессу send_outbox);
+    захваченные другими письма пропускаются.
+    """
+    token: str = uuid4().hex
+    get_claimable_emails().filter(pk__in=list(email_ids)).update(
+        locked_at=timezone.now(),
+        lock_token=token,
+    )
+    return list(OutboxEmail.objects.filter(lock_token=token).order_by('pk'))
+
+
+def release_emails(emails: Iterable[OutboxEmail]) -> None:
+    """Снимает захват с писем, которые не удалось отправить."""
+    OutboxEmail.objects.filter(
+        pk__in=[email.pk for email in emails]
+    ).update(locked_at=None, lock_token='')
+
+
+def send_batch(emails: Iterable[OutboxEmail], connection) -> Tuple[int, int]:
+    """Отправляет захваченные письма через открытое соединение.
+
+    Неудачная попытка (любая ошибка отправки, а не только SMTP)
+    откладывает письмо на EMAIL_OUTBOX_RETRY_DELAY секунд, удваивая
+    задержку с каждой следующей попыткой, поэтому письмо с постоянной
+    ошибкой исчерпывает EMAIL_OUTBOX_MAX_ATTEMPTS, а не повторяется
+    бесконечно. После попытки захват с письма снимается.
+    """
+    emails: List[OutboxEmail] = list(emails)
+    sent: int = 0
+    for email in emails:
+        email.attempts += 1
+        email.locked_at = None
+        email.lock_token = ''
+        try:
+            EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                [email.recipient],
+                connection=connection,
+            ).send()
+        except Exception as error:
+            email.last_error = f'{type(error).__name__}: {error}'
+            email.next_attempt_at = timezone.now() + timedelta(
+                seconds=settings.EMAIL_OUTBOX_RETRY_DELAY
+                * 2 ** (email.attempts - 1)
+            )
+        else:
+            email.sent_at = timezone.now()
+            sent += 1
+    OutboxEmail.objects.bulk_update(
+        emails,
+        (
+            'attempts',
+            'sent_at',
+            'next_attempt_at',
+            'last_error',
+            'locked_at',
+            'lock_token',
+        ),
+    )
+    return sent, len(emails) - sent
+
+
+def send_emails(emails: Iterable[OutboxEmail]) -> Tuple[int, int]:
+    """Отправляет захваченные письма через одно соединение.
+
+    Если соединиться с почтовым сервером не удалось, захват снимается
+    и письма остаются в очереди для команды send_outbox.
+    """
+    emails: List[OutboxEmail] = list(emails)
+    if not emails:
+        return 0, 0
+    try:
+        with get_connection(fail_silently=False) as connection:
+            return send_batch(emails, connection)
+    except Exception:
+        logger.exception('Письма из очереди не отправлены')
+        release_emails(emails)
+        return 0, 0
+
+
+def drain_outbox(batch_size: int) -> Tuple[int, int]:
+    """Отправляет пакетами все ожидающие письма через одно соединение.
+
+    Каждый пакет сначала захватывается, поэтому несколько процессов
+    send_outbox и фоновые потоки процессов приложения не отправляют одно
+    письмо дважды. Если результат пакета не удалось записать, захват
+    снимается, чтобы письма не ждали EMAIL_OUTBOX_LOCK_TIMEOUT.
+    С почтовым сервером соединяется, только если очередь не пуста.
+    Возвращает число отправленных писем и неудачных попыток.
+    """
+    sent: int = 0
+    failed: int = 0
+    candidates: List[int] = get_pending_ids(batch_size)
+    if not candidates:
+        return sent, failed
+    with get_connection(fail_silently=False) as connection:
+        while candidates:
+            batch: List[OutboxEmail] = claim_emails(candidates)
+            try:
+                batch_sent, batch_failed = send_batch(batch, connection)
+            except Exception:
+                release_emails(batch)
+                raise
+            sent += batch_sent
+            failed += batch_failed
+            candidates = get_pending_ids(batch_size)
+    return sent, failed
+
+
+def get_pending_ids(batch_size: int) -> List[int]:
+    """Идентификаторы очередного пакета ожидающих писем."""
+    return list(get_pending_emails().values_list('pk', flat=True)[:batch_size])
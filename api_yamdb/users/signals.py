@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Пользователи изменены в обход User.save() (update(), bulk_update());
+# аргументы: user_ids - идентификаторы измененных пользователей,
+# fields - названия измененных полей.
+users_changed = Signal()
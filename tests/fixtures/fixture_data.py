@@ -0,0 +1,18 @@
+import csv
+import os
+import shutil
+
+import pytest
+from django.conf import settings
+
+
+def count_rows(path, file_name):
+    with open(os.path.join(path, file_name), encoding='utf-8') as data_file:
+        return sum(1 for _ in csv.DictReader(data_file))
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    path = tmp_path / 'data'
+    shutil.copytree(settings.DATA_FILE_PATH, path)
+    return str(path)
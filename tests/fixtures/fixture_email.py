@@ -0,0 +1,6 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def email_delivery_on_commit(settings):
+    settings.EMAIL_OUTBOX_DELIVERY = 'on_commit'
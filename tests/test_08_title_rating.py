@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_reviews(self, admin_client, admin, user,
+                                       user_client):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.reviews_count == 2 and title.rating == 5, (
+            'Проверьте, что при создании отзыва обновляются сохраненные '
+            'поля `rating` и `reviews_count` произведения.'
+        )
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        response = admin_client.patch(url, data={'score': 9})
+        assert response.status_code == HTTPStatus.OK
+        title.refresh_from_db()
+        assert title.rating == 7, (
+            'Проверьте, что при изменении оценки отзыва пересчитывается '
+            'рейтинг произведения.'
+        )
+
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title.refresh_from_db()
+        assert title.reviews_count == 1 and title.rating == 5, (
+            'Проверьте, что при удалении отзыва пересчитываются поля '
+            '`rating` и `reviews_count` произведения.'
+        )
+
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') == 5
+
+    def test_02_update_ratings_command(self, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        Title.objects.update(rating=None, reviews_count=0)
+
+        call_command('update_ratings')
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.reviews_count == 1 and title.rating == 5, (
+            'Проверьте, что команда `update_ratings` пересчитывает рейтинг '
+            'и количество отзывов всех произведений.'
+        )
+        assert Title.objects.get(pk=titles[1]['id']).reviews_count == 0
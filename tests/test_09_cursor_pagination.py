@@ -0,0 +1,209 @@
+import json
+from base64 import b64encode
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Review, Title
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    def collect_pages(self, client, url):
+        results = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` с курсорной пагинацией '
+                'возвращает ответ со статусом 200.'
+            )
+            data = response.json()
+            assert 'count' not in data and 'next' in data, (
+                f'Проверьте, что при параметре `pagination=cursor` эндпоинт '
+                f'`{url}` использует курсорную пагинацию.'
+            )
+            results.extend(data['results'])
+            url = data['next']
+            pages += 1
+        return results, pages
+
+    def test_01_titles_cursor(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        results, pages = self.collect_pages(
+            client, '/api/v1/titles/?pagination=cursor&limit=1'
+        )
+        assert [title['id'] for title in results] == sorted(
+            title['id'] for title in titles
+        ), (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` '
+            'возвращает все произведения в порядке возрастания `id`.'
+        )
+        assert pages == len(titles), (
+            'Проверьте, что курсорная пагинация учитывает параметр `limit`.'
+        )
+
+        response = client.get('/api/v1/titles/')
+        assert 'count' in response.json(), (
+            'Проверьте, что без параметра `pagination=cursor` используется '
+            'пагинация по умолчанию.'
+        )
+
+    def test_02_reviews_and_comments_cursor(self, admin_client, admin, user,
+                                            user_client, moderator,
+                                            moderator_client, client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            '?pagination=cursor&limit=2'
+        )
+        results, pages = self.collect_pages(client, url)
+        assert pages == 2, (
+            'Проверьте, что курсорная пагинация учитывает параметр `limit`.'
+        )
+        assert [review['id'] for review in results] == [
+            review['id'] for review in reversed(reviews)
+        ], (
+            'Проверьте, что курсорная пагинация отзывов возвращает их '
+            'от новых к старым.'
+        )
+
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/?pagination=cursor'
+        )
+        results, _ = self.collect_pages(client, url)
+        assert len(results) == len(comments), (
+            'Проверьте, что курсорная пагинация комментариев возвращает '
+            'все комментарии к отзыву.'
+        )
+
+    def test_03_same_pub_date_keyset(self, django_user_model, client):
+        title = Title.objects.create(name='Title', year=2000, description='')
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.fake'
+            )
+            for number in range(7)
+        ]
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='text', score=5)
+            for author in authors
+        )
+        Review.objects.update(pub_date=timezone.now())
+
+        url = f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor&limit=3'
+        with CaptureQueriesContext(connection) as context:
+            results, pages = self.collect_pages(client, url)
+        assert [review['id'] for review in results] == sorted(
+            Review.objects.values_list('pk', flat=True), reverse=True
+        ), (
+            'Проверьте, что курсорная пагинация возвращает все отзывы '
+            'с одинаковой датой публикации ровно по одному разу.'
+        )
+        assert pages == 3
+        assert not any(
+            'OFFSET' in query['sql'].upper() for query in context.captured_queries
+        ), (
+            'Проверьте, что страница выбирается по составному ключу '
+            '(pub_date, id), а не смещением.'
+        )
+
+        response = client.get(url)
+        response = client.get(response.json()['next'])
+        previous = client.get(response.json()['previous']).json()
+        assert [review['id'] for review in previous['results']] == [
+            review['id'] for review in results[:3]
+        ], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую страницу.'
+        )
+        assert previous['previous'] is None
+
+    def test_04_cursor_with_search_rejected(self, admin_client, client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/?pagination=cursor&search=a')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` '
+            'не сочетается с параметром `search`.'
+        )
+        response = client.get('/api/v1/titles/?cursor=invalid')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_keyset_uses_index_range(self, django_user_model, client):
+        title = Title.objects.create(name='Title', year=2000, description='')
+        for number in range(2):
+            author = django_user_model.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='t', score=5
+            )
+        url = f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor&limit=1'
+        next_url = client.get(url).json()['next']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(next_url)
+        assert response.status_code == HTTPStatus.OK
+        page_query = next(
+            query['sql'] for query in context.captured_queries
+            if 'FROM "reviews_review"' in query['sql']
+            and 'LIMIT' in query['sql'].upper()
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {page_query}')
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        assert '"reviews_review"."pub_date" <=' in page_query, (
+            'Проверьте, что условие курсора содержит отдельное ограничение '
+            '`pub_date <= x`: по условию `pub_date < x OR (pub_date = x '
+            'AND id < y)` старые версии SQLite не ищут по индексу.'
+        )
+        assert 'pub_date<' in plan.replace(' ', ''), (
+            'Проверьте, что страница отзывов выбирается поиском по индексу '
+            f'с ограничением по `pub_date`. План запроса: {plan}'
+        )
+
+    @pytest.mark.parametrize('position', [
+        ['garbage', '1'],
+        [None, None],
+        ['2020-01-01T00:00:00+00:00'],
+        'not a list',
+        ['2020-01-01T00:00:00Z', 1e30],
+        ['2020-01-01T00:00:00Z', 2 ** 63],
+        ['2020-01-01T00:00:00Z', float('inf')],
+    ])
+    def test_06_invalid_cursor_position(self, client, position):
+        title = Title.objects.create(name='Title', year=2000, description='')
+        cursor = b64encode(
+            json.dumps({'p': position, 'r': False}).encode()
+        ).decode()
+        response = client.get(
+            f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor'
+            f'&cursor={cursor}'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что курсор с некорректной позицией отклоняется '
+            'ответом со статусом 404.'
+        )
+
+    @pytest.mark.parametrize('position', [['abc'], [None], [1, 2]])
+    def test_07_invalid_titles_cursor(self, client, position):
+        cursor = b64encode(
+            json.dumps({'p': position, 'r': True}).encode()
+        ).decode()
+        response = client.get(
+            f'/api/v1/titles/?pagination=cursor&cursor={cursor}'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что курсор произведений с некорректной позицией '
+            'отклоняется ответом со статусом 404.'
+        )
@@ -0,0 +1,46 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleQueries:
+
+    def create_many_titles(self, admin_client, count):
+        titles, categories, genres = create_titles(admin_client)
+        for number in range(count):
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': f'Произведение {number}',
+                'year': 2000,
+                'genre': [genre['slug'] for genre in genres],
+                'category': categories[number % 2]['slug'],
+                'description': 'Описание',
+            })
+            assert response.status_code == HTTPStatus.CREATED
+        return titles
+
+    def test_01_title_list_queries(self, admin_client, client,
+                                   django_assert_num_queries):
+        self.create_many_titles(admin_client, 13)
+        # COUNT для пагинации, произведения с категориями, жанры.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == 15, (
+            'Проверьте, что страница списка произведений заполнена.'
+        )
+
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/?pagination=cursor')
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_title_detail_queries(self, admin_client, client,
+                                     django_assert_num_queries):
+        titles = self.create_many_titles(admin_client, 0)
+        # Дата изменения для ETag, произведение с категорией, жанры.
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['genre']) == 2
@@ -0,0 +1,77 @@
+import logging
+
+import pytest
+from django.urls import get_resolver
+
+from tests.utils import check_query_budget, create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11QueryBudget:
+
+    def test_01_endpoints_within_budget(self, admin_client, admin, user,
+                                        user_client, moderator,
+                                        moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        urls = (
+            '/api/v1/titles/',
+            title_url,
+            f'{title_url}reviews/',
+            review_url,
+            f'{review_url}comments/',
+            f'{review_url}comments/{comments[0]["id"]}/',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            '/api/v1/users/',
+            f'/api/v1/users/{user.username}/',
+            '/api/v1/users/me/',
+        )
+        for url in urls:
+            check_query_budget(admin_client, url)
+
+    def test_02_server_timing_header(self, client):
+        response = client.get('/api/v1/categories/')
+        assert 'queries' in response.get('Server-Timing', ''), (
+            'Проверьте, что ответ содержит заголовок `Server-Timing` '
+            'с числом SQL-запросов.'
+        )
+
+    def test_03_budget_exceeded_logged(self, client, settings, caplog):
+        settings.QUERY_BUDGETS = {'categories-list': 0}
+        with caplog.at_level(logging.WARNING, logger='api.middleware'):
+            client.get('/api/v1/categories/')
+        assert 'categories-list' in caplog.text, (
+            'Проверьте, что превышение бюджета SQL-запросов логируется.'
+        )
+
+    def test_04_streaming_queries_counted(self, admin_client, settings,
+                                          caplog):
+        settings.QUERY_BUDGETS = {'export_data': 1}
+        settings.EXPORT_CHUNK_SIZE = 1
+        create_titles(admin_client)
+        with caplog.at_level(logging.WARNING, logger='api.middleware'):
+            response = admin_client.get('/api/v1/export/titles/')
+            assert 'export_data' not in caplog.text
+            b''.join(response.streaming_content)
+        assert 'export_data' in caplog.text, (
+            'Проверьте, что SQL-запросы, выполненные при формировании '
+            'потокового ответа, учитываются в бюджете.'
+        )
+
+    def test_05_budget_names_exist(self, settings):
+        url_names = {
+            name for name in get_resolver().reverse_dict
+            if isinstance(name, str)
+        }
+        unknown = set(settings.QUERY_BUDGETS) - url_names
+        assert not unknown, (
+            f'Проверьте, что ключи `QUERY_BUDGETS` {sorted(unknown)} '
+            'совпадают с именами url.'
+        )
@@ -0,0 +1,58 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+
+    def search(self, client, text):
+        response = client.get('/api/v1/titles/', {'search': text})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/` с параметром '
+            '`search` возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_by_name_and_description(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.search(client, 'терминат') == [titles[0]['name']], (
+            'Проверьте, что параметр `search` ищет произведения по началу '
+            'слова в названии без учета регистра.'
+        )
+        assert self.search(client, 'yippie') == [titles[1]['name']], (
+            'Проверьте, что параметр `search` ищет произведения по описанию.'
+        )
+        assert self.search(client, 'отсутствует') == []
+
+    def test_02_search_index_follows_writes(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Робокоп'})
+        assert self.search(client, 'терминатор') == []
+        assert self.search(client, 'робокоп') == ['Робокоп'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        admin_client.delete(url)
+        assert self.search(client, 'робокоп') == [], (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения.'
+        )
+
+    def test_03_search_ranking(self, admin_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Орешек знаний',
+            'year': 2000,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+            'description': 'Крепкий орешек, крепкий орешек.',
+        })
+        assert self.search(client, 'крепкий орешек')[0] == (
+            titles[1]['name']
+        ), (
+            'Проверьте, что результаты поиска ранжируются по релевантности.'
+        )
@@ -0,0 +1,45 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13PrefixSearch:
+
+    def search(self, client, url, text):
+        response = client.get(url, {'search': text})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}?search=` возвращает ответ '
+            'со статусом 200.'
+        )
+        return response.json()['results']
+
+    def test_01_genre_search_ignores_cyrillic_case(self, admin_client,
+                                                    client):
+        genres = create_genre(admin_client)
+        drama = [genres[2]]
+        url = '/api/v1/genres/'
+        for text in ('драма', 'ДРАМА', 'Др'):
+            assert self.search(client, url, text) == drama, (
+                f'Проверьте, что поиск `{url}?search={text}` находит жанры '
+                'по началу названия без учета регистра.'
+            )
+        assert self.search(client, url, 'рама') == [], (
+            'Проверьте, что поиск выполняется по началу названия.'
+        )
+
+    def test_02_category_search(self, admin_client, client):
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'}
+        )
+        results = self.search(client, '/api/v1/categories/', 'мУЗ')
+        assert [category['slug'] for category in results] == ['music']
+
+    def test_03_user_search(self, admin_client, admin, user):
+        results = self.search(admin_client, '/api/v1/users/', 'testu')
+        assert [item['username'] for item in results] == [user.username], (
+            'Проверьте, что поиск пользователей выполняется по началу '
+            'имени без учета регистра.'
+        )
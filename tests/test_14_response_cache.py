@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import transaction
+
+from api.cache import get_model_versions
+from reviews.models import Category
+from tests.utils import create_categories, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ResponseCache:
+
+    def test_01_cached_list_skips_database(self, admin_client, client,
+                                           django_assert_num_queries):
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.json() == first.json(), (
+            f'Проверьте, что повторный GET-запрос к `{url}` возвращает '
+            'закэшированный ответ без обращения к базе данных.'
+        )
+
+    def test_02_write_invalidates_cache(self, admin_client, client):
+        categories = create_categories(admin_client)
+        url = '/api/v1/categories/'
+        assert client.get(url).json()['count'] == len(categories)
+
+        admin_client.post(url, data={'name': 'Музыка', 'slug': 'music'})
+        assert client.get(url).json()['count'] == len(categories) + 1, (
+            f'Проверьте, что создание категории инвалидирует кэш `{url}`.'
+        )
+        admin_client.delete(f'{url}music/')
+        assert client.get(url).json()['count'] == len(categories), (
+            f'Проверьте, что удаление категории инвалидирует кэш `{url}`.'
+        )
+
+    def test_03_review_invalidates_title_list(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        client.get(url)
+        response = admin_client.post(
+            f'{url}{titles[0]["id"]}/reviews/', data={'text': 'Ок', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        results = client.get(url).json()['results']
+        ratings = {title['id']: title['rating'] for title in results}
+        assert ratings[titles[0]['id']] == 7, (
+            f'Проверьте, что новый отзыв инвалидирует кэш `{url}`.'
+        )
+
+    def test_04_query_string_is_part_of_key(self, admin_client, client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        assert client.get(url).json()['count'] == 2
+        assert client.get(url, {'year': 1984}).json()['count'] == 1
+
+    def test_05_version_bumped_on_commit(self):
+        before = get_model_versions((Category, ))
+        with transaction.atomic():
+            Category.objects.create(name='Категория', slug='category')
+            assert get_model_versions((Category, )) == before, (
+                'Проверьте, что версия модели не меняется до фиксации '
+                'транзакции.'
+            )
+        assert get_model_versions((Category, )) != before, (
+            'Проверьте, что версия модели увеличивается после фиксации '
+            'транзакции.'
+        )
+
+    def test_06_host_is_part_of_key(self, admin_client, client):
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        client.get(url, {'limit': 1}, HTTP_HOST='internal.local')
+        response = client.get(
+            url, {'limit': 1}, HTTP_HOST='api.example.com', secure=True
+        )
+        assert response.json()['next'].startswith(
+            'https://api.example.com/'
+        ), (
+            f'Проверьте, что ключ кэша `{url}` включает схему и хост: '
+            'ссылки пагинации в ответе абсолютные.'
+        )
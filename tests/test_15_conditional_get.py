@@ -0,0 +1,150 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.utils.http import parse_http_date
+
+from reviews.models import Category
+from tests.utils import create_single_review, create_titles
+from users.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок `ETag`.'
+        )
+        last_modified = response.get('Last-Modified')
+        assert last_modified, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок `Last-Modified`.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с совпадающим '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с `If-Modified-Since`, '
+            'равным `Last-Modified`, возвращает ответ со статусом 304.'
+        )
+        return etag
+
+    def test_01_title_detail(self, admin_client, client):
+        titles, categories, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = self.check_not_modified(client, url)
+
+        admin_client.patch(url, data={'description': 'Новое описание'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения произведения `ETag` меняется.'
+        )
+        etag = response['ETag']
+
+        admin_client.delete(f'/api/v1/categories/{categories[1]["slug"]}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения категорий `ETag` произведения '
+            'меняется.'
+        )
+        etag = response['ETag']
+
+        category = Category.objects.get(slug=categories[0]['slug'])
+        category.name = 'Новое название'
+        category.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после переименования категории `ETag` '
+            'произведения меняется.'
+        )
+
+    def test_02_title_reviews(self, admin_client, user, user_client,
+                              client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 5)
+        etag = self.check_not_modified(client, url)
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления отзыва `ETag` списка отзывов '
+            'меняется.'
+        )
+        assert response.json()['count'] == 2
+
+        response = client.get(f'{url}?limit=1', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+        etag = client.get(url)['ETag']
+        user.username = 'renamed_user'
+        user.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения имени автора `ETag` списка '
+            'отзывов меняется.'
+        )
+        assert 'renamed_user' in {
+            review['author'] for review in response.json()['results']
+        }
+
+    def test_03_not_modified_without_serialization(
+        self, admin_client, client, django_assert_num_queries
+    ):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_04_last_modified_follows_related_changes(self, admin_client,
+                                                      client):
+        titles, categories, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        last_modified = client.get(url)['Last-Modified']
+        time.sleep(1)
+        category = Category.objects.get(slug=categories[0]['slug'])
+        category.name = 'Новое название'
+        category.save()
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после переименования категории `Last-Modified` '
+            'произведения меняется.'
+        )
+        assert parse_http_date(response['Last-Modified']) > (
+            parse_http_date(last_modified)
+        )
+
+    def test_05_reviews_etag_ignores_other_user_changes(
+        self, admin_client, user, client
+    ):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 5)
+        etag = client.get(url)['ETag']
+
+        User.objects.create_user(username='newcomer', email='new@yamdb.fake')
+        user.bio = 'Новое описание'
+        user.save()
+        User.objects.filter(pk=user.pk).bump_token_version()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что регистрация пользователей и изменение полей, '
+            'кроме имени, не меняют `ETag` списка отзывов.'
+        )
+
+        user.delete()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что удаление пользователя меняет `ETag` списка '
+            'отзывов.'
+        )
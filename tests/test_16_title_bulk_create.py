@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from tests.utils import create_categories, create_genre
+
+URL = '/api/v1/titles/bulk/'
+
+
+def make_titles(count, genres, categories):
+    return [
+        {
+            'name': f'Произведение {number}',
+            'year': 1990 + number % 30,
+            'description': 'Описание',
+            'genre': [genre['slug'] for genre in genres[:number % 3 + 1]],
+            'category': categories[number % 2]['slug'],
+        }
+        for number in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleBulkCreate:
+
+    def test_01_bulk_create(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = make_titles(5, genres, categories)
+        response = admin_client.post(URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Если POST-запрос администратора к `{URL}` содержит корректные '
+            'данные - должен вернуться ответ со статусом 201.'
+        )
+        results = response.json()
+        assert [title['name'] for title in results] == [
+            title['name'] for title in data
+        ]
+        for title, item in zip(results, data):
+            assert [genre['slug'] for genre in title['genre']] == sorted(
+                item['genre'], key=lambda slug: [
+                    genre['name'] for genre in genres if genre['slug'] == slug
+                ]
+            )
+            assert title['category']['slug'] == item['category']
+        assert Title.objects.count() == 5
+
+        response = admin_client.get(f'/api/v1/titles/{results[-1]["id"]}/')
+        assert response.json() == results[-1], (
+            'Проверьте, что массово созданные произведения доступны '
+            'по отдельности и сохранены вместе с жанрами.'
+        )
+
+    def test_02_per_item_errors(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = make_titles(5, genres, categories)
+        data[1]['category'] = 'unknown'
+        data[2]['year'] = 'дветыщи'
+        data[3]['genre'] = []
+        data[4]['genre'] = ['unknown1', 'unknown2']
+        response = admin_client.post(URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert (
+            isinstance(errors, list) and len(errors) == 5
+            and errors[0] == {} and 'category' in errors[1]
+            and 'year' in errors[2] and 'genre' in errors[3]
+        ), (
+            f'Проверьте, что при ошибках в данных `{URL}` возвращает '
+            'список ошибок по каждому произведению.'
+        )
+        assert errors[4] == {'genre': [
+            'Жанров со слагами unknown1, unknown2 не существует.'
+        ]}, (
+            'Проверьте, что в сообщении об ошибке перечислены '
+            'несуществующие слаги жанров.'
+        )
+        assert Title.objects.count() == 0, (
+            'Проверьте, что при ошибках валидации не создается ни одного '
+            'произведения.'
+        )
+
+    def test_03_constant_queries(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        query_counts = []
+        for count in (2, 20):
+            data = make_titles(count, genres, categories)
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(URL, data=data, format='json')
+            assert response.status_code == HTTPStatus.CREATED
+            query_counts.append(len(context))
+        assert query_counts[0] == query_counts[1], (
+            f'Проверьте, что число SQL-запросов `{URL}` не зависит от '
+            'количества произведений.'
+        )
+
+    def test_04_permissions(self, user_client, client):
+        response = client.post(URL, data=[], content_type='application/json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.post(URL, data=[], format='json').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
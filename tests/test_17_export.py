@@ -0,0 +1,58 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+def read_ndjson(response):
+    content = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Export:
+
+    def test_01_export(self, admin_client, admin, user, user_client,
+                       settings):
+        settings.EXPORT_CHUNK_SIZE = 1
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос администратора к '
+            '`/api/v1/export/titles/` возвращает ответ со статусом 200.'
+        )
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдается потоковым ответом.'
+        )
+        rows = read_ndjson(response)
+        assert [row['id'] for row in rows] == [
+            title['id'] for title in titles
+        ]
+        assert rows[0]['genre'] == sorted(titles[0]['genre'])
+        assert rows[0]['category'] == titles[0]['category']
+        assert rows[0]['reviews_count'] == len(reviews)
+
+        rows = read_ndjson(admin_client.get('/api/v1/export/reviews/'))
+        assert [(row['id'], row['author']) for row in rows] == [
+            (review['id'], review['author']) for review in reviews
+        ]
+
+        rows = read_ndjson(admin_client.get('/api/v1/export/comments/'))
+        assert [(row['id'], row['text']) for row in rows] == [
+            (comment['id'], comment['text']) for comment in comments
+        ]
+
+    def test_02_export_permissions(self, admin_client, user_client, client):
+        assert admin_client.get('/api/v1/export/unknown/').status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+        assert user_client.get('/api/v1/export/titles/').status_code == (
+            HTTPStatus.FORBIDDEN
+        ), 'Проверьте, что выгрузка доступна только администратору.'
+        assert client.get('/api/v1/export/titles/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
@@ -0,0 +1,298 @@
+import csv
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.authentication import get_token_version
+from reviews.importing import ChunkTask, parse_chunk, save_known_keys
+from reviews.models import Comment, Genre, Review, Title
+from tests.fixtures.fixture_data import count_rows
+from users.models import User
+
+
+def rewrite_rows(path, file_name, change):
+    file_name = os.path.join(path, file_name)
+    with open(file_name, encoding='utf-8') as data_file:
+        rows = list(csv.DictReader(data_file))
+    fieldnames = list(rows[0])
+    rows = change(rows)
+    with open(file_name, 'w', encoding='utf-8', newline='') as data_file:
+        writer = csv.DictWriter(data_file, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+def break_author(rows):
+    rows[0]['author'] = '999999'
+    return rows
+
+
+def load_data(*args, **kwargs):
+    out = StringIO()
+    call_command('load_data', *args, stdout=out, **kwargs)
+    return out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18LoadData:
+
+    def test_01_load_reference_dataset(self, data_path):
+        output = load_data(path=data_path, chunk_size=7, batch_size=3)
+        expected = (
+            (Title, 'titles.csv'),
+            (Title.genre.through, 'genre_title.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+            (User, 'users.csv'),
+        )
+        for model, file_name in expected:
+            assert model.objects.count() == count_rows(data_path, file_name), (
+                f'Проверьте, что команда `load_data` загружает все строки '
+                f'файла `{file_name}`.'
+            )
+        assert 'строк/с' in output, (
+            'Проверьте, что команда `load_data` сообщает о скорости загрузки.'
+        )
+        assert Genre.objects.get(slug='drama').name_search == 'драма'
+        title = Title.objects.filter(reviews_count__gt=0).first()
+        assert title.rating is not None
+
+    def test_02_unresolved_references_skipped(self, data_path):
+        file_name = os.path.join(data_path, 'comments.csv')
+        with open(file_name, encoding='utf-8') as data_file:
+            rows = list(csv.DictReader(data_file))
+        rows[0]['author'] = '999999'
+        with open(file_name, 'w', encoding='utf-8', newline='') as data_file:
+            writer = csv.DictWriter(data_file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+        output = load_data(path=data_path)
+        assert "author='999999'" in output, (
+            'Проверьте, что `load_data` сообщает о строках с '
+            'несуществующими связанными объектами.'
+        )
+        assert Comment.objects.count() == len(rows) - 1
+
+    def test_03_failed_file_rolled_back_and_resumed(self, data_path):
+        file_name = os.path.join(data_path, 'review.csv')
+        with open(file_name, encoding='utf-8') as data_file:
+            rows = list(csv.DictReader(data_file))
+        with open(file_name, 'w', encoding='utf-8', newline='') as data_file:
+            writer = csv.DictWriter(data_file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows + [{**rows[0], 'id': 100000}])
+
+        with pytest.raises(SystemExit):
+            load_data(path=data_path, chunk_size=10)
+        assert Review.objects.count() == 0, (
+            'Проверьте, что при ошибке изменения из файла отменяются.'
+        )
+        assert Title.objects.exists()
+
+        with open(file_name, 'w', encoding='utf-8', newline='') as data_file:
+            writer = csv.DictWriter(data_file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        load_data(path=data_path, resume_from='review.csv')
+        assert Review.objects.count() == len(rows), (
+            'Проверьте, что параметр `--resume-from` продолжает загрузку '
+            'с указанного файла.'
+        )
+
+    def test_04_parallel_workers(self, data_path):
+        load_data(path=data_path, workers=3, chunk_size=5)
+        assert Review.objects.count() == count_rows(data_path, 'review.csv')
+        assert Title.genre.through.objects.count() == count_rows(
+            data_path, 'genre_title.csv'
+        ), (
+            'Проверьте, что с параметром `--workers` загружаются все файлы.'
+        )
+
+    def test_05_invalid_rows_reported(self, data_path):
+        file_name = os.path.join(data_path, 'titles.csv')
+        with open(file_name, encoding='utf-8') as data_file:
+            rows = list(csv.DictReader(data_file))
+        rows[0]['year'] = 'дветыщи'
+        with open(file_name, 'w', encoding='utf-8', newline='') as data_file:
+            writer = csv.DictWriter(data_file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+        output = load_data(path=data_path, workers=2)
+        assert 'titles.csv, строка 2: year' in output, (
+            'Проверьте, что `load_data` сообщает о строках с '
+            'некорректными значениями.'
+        )
+        assert Title.objects.count() == len(rows) - 1
+
+    def test_06_upsert(self, data_path):
+        load_data(path=data_path)
+        output = load_data(path=data_path, upsert=True)
+        assert 'Работа загрузчика завершена успешно!' in output, (
+            'Проверьте, что `load_data --upsert` можно запускать для уже '
+            'заполненной базы данных.'
+        )
+
+        def rewrite(file_name, change):
+            file_name = os.path.join(data_path, file_name)
+            with open(file_name, encoding='utf-8') as data_file:
+                rows = list(csv.DictReader(data_file))
+            fieldnames = list(rows[0])
+            rows = change(rows)
+            with open(
+                file_name, 'w', encoding='utf-8', newline=''
+            ) as data_file:
+                writer = csv.DictWriter(data_file, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(rows)
+            return rows
+
+        def rename_first(rows):
+            rows[0]['name'] = 'Новое название'
+            return rows
+
+        titles = rewrite('titles.csv', rename_first)
+        comments = rewrite('comments.csv', lambda rows: rows[1:])
+        output = load_data(path=data_path, upsert=True)
+        assert 'titles.csv: добавлено 0, обновлено 1, удалено 0' in output, (
+            'Проверьте, что `load_data --upsert` обновляет только '
+            'измененные строки.'
+        )
+        assert 'comments.csv: добавлено 0, обновлено 0, удалено 1' in output
+        assert 'review.csv: добавлено 0, обновлено 0, удалено 0' in output
+        assert Title.objects.get(pk=titles[0]['id']).name == 'Новое название'
+        assert Comment.objects.count() == len(comments)
+        response_titles = Title.objects.search('новое')
+        assert [title.pk for title in response_titles] == [
+            int(titles[0]['id'])
+        ]
+
+    def test_07_upsert_keeps_rejected_rows(self, data_path):
+        load_data(path=data_path, upsert=True)
+        reviews_count = Review.objects.count()
+
+        def break_year(rows):
+            rows[0]['year'] = 'oops'
+            return rows
+
+        titles = rewrite_rows(data_path, 'titles.csv', break_year)
+        output = load_data(path=data_path, upsert=True)
+        assert 'titles.csv: добавлено 0, обновлено 0, удалено 0' in output
+        assert Title.objects.filter(pk=titles[0]['id']).exists(), (
+            'Проверьте, что `load_data --upsert` не удаляет записи, строки '
+            'которых пропущены из-за ошибок.'
+        )
+        assert Review.objects.count() == reviews_count
+
+    def test_08_upsert_role_change_revokes_tokens(self, data_path):
+        load_data(path=data_path, upsert=True)
+        users = rewrite_rows(data_path, 'users.csv', lambda rows: rows)
+        user = User.objects.get(pk=users[0]['id'])
+        version = get_token_version(user.pk)
+        new_role = (
+            User.UserRoles.ADMIN if user.role != User.UserRoles.ADMIN
+            else User.UserRoles.USER
+        )
+
+        def change_role(rows):
+            rows[0]['role'] = new_role
+            rows[1]['bio'] = 'Новое описание'
+            return rows
+
+        rewrite_rows(data_path, 'users.csv', change_role)
+        load_data(path=data_path, upsert=True)
+        assert get_token_version(user.pk) == version + 1, (
+            'Проверьте, что смена роли через `load_data --upsert` '
+            'увеличивает версию токенов и сбрасывает кэш пользователя.'
+        )
+        assert User.objects.get(pk=users[1]['id']).token_version == 0
+
+    def test_09_workers_split_quoted_newlines(self, data_path):
+        def multiline(rows):
+            for row in rows[::4]:
+                row['text'] = f'Первая строка\n"вторая", строка\r\n{row["id"]}'
+            return rows
+
+        reviews = rewrite_rows(data_path, 'review.csv', multiline)
+        output = load_data(path=data_path, workers=2, chunk_size=3)
+        assert 'Строка пропущена' not in output
+        texts = dict(Review.objects.values_list('pk', 'text'))
+        assert texts == {int(row['id']): row['text'] for row in reviews}, (
+            'Проверьте, что при загрузке с параметром `--workers` файл '
+            'делится на пакеты без разрыва значений с переводами строк.'
+        )
+
+    def test_10_workers_report_like_serial(self, data_path):
+        def break_rows(rows):
+            rows[0]['author'] = '999999'
+            rows[5]['score'] = '11'
+            return rows
+
+        rewrite_rows(data_path, 'review.csv', break_rows)
+        serial = load_data(path=data_path, chunk_size=4)
+        serial_reviews = list(Review.objects.values_list('pk', flat=True))
+        call_command('flush', interactive=False)
+        parallel = load_data(path=data_path, workers=3, chunk_size=4)
+
+        def warnings(output):
+            return [line for line in output.splitlines() if 'строка' in line]
+
+        assert warnings(parallel) == warnings(serial), (
+            'Проверьте, что с параметром `--workers` сообщения о пропущенных '
+            'строках совпадают с последовательной загрузкой.'
+        )
+        assert len(warnings(serial)) == 2
+        assert list(Review.objects.values_list('pk', flat=True)) == (
+            serial_reviews
+        )
+
+    def test_11_missing_date_set_to_now(self, data_path):
+        def clear_date(rows):
+            rows[0]['pub_date'] = ''
+            return rows
+
+        reviews = rewrite_rows(data_path, 'review.csv', clear_date)
+        started = timezone.now()
+        load_data(path=data_path)
+        review = Review.objects.get(pk=reviews[0]['id'])
+        assert review.pub_date >= started, (
+            'Проверьте, что `load_data` ставит текущее время, если дата '
+            'публикации в файле не указана.'
+        )
+        assert Review.objects.get(pk=reviews[1]['id']).pub_date == (
+            parse_datetime(reviews[1]['pub_date'])
+        )
+
+    def test_12_workers_prepare_rows_without_queries(
+        self, data_path, tmp_path, django_assert_num_queries
+    ):
+        load_data(path=data_path)
+        rows = rewrite_rows(
+            data_path, 'review.csv', lambda rows: break_author(rows[:2])
+        )
+        broken_id, valid_id = rows[0]['id'], rows[1]['id']
+        keys_path = str(tmp_path / 'review.keys')
+        save_known_keys(keys_path, Review, ['title_id', 'author'])
+        task = ChunkTask(
+            data_path, 'review.csv', 'reviews.Review', ['title_id', 'author'],
+            list(rows[0]), keys_path,
+            rows=list(enumerate(rows, start=2)),
+        )
+        with django_assert_num_queries(0):
+            prepared, messages, rejected = parse_chunk(task)
+        assert [key for key, _, _ in prepared] == [valid_id], (
+            'Проверьте, что процессы-обработчики сверяют внешние ключи '
+            'с ключами связанных таблиц без запросов к базе данных.'
+        )
+        assert rejected == [broken_id]
+        assert "author='999999'" in messages[0]
+        assert isinstance(prepared[0][1], tuple), (
+            'Проверьте, что процессы-обработчики возвращают готовые '
+            'к записи значения столбцов.'
+        )
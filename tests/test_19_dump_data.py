@@ -0,0 +1,119 @@
+import csv
+import gzip
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils.dateparse import parse_datetime
+
+from reviews.models import Comment, Review, Title
+from tests.fixtures.fixture_data import count_rows
+from users.models import User
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as data_file:
+        return list(csv.DictReader(data_file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19DumpData:
+
+    def test_01_dump_matches_load_format(self, data_path, tmp_path):
+        call_command('load_data', path=data_path, stdout=StringIO())
+        dump_path = str(tmp_path / 'dump')
+        call_command(
+            'dump_data', path=dump_path, chunk_size=7, stdout=StringIO()
+        )
+
+        for file_name in os.listdir(data_path):
+            source = read_csv(os.path.join(data_path, file_name))
+            dumped = read_csv(os.path.join(dump_path, file_name))
+            assert len(dumped) == len(source), (
+                f'Проверьте, что `dump_data` выгружает все строки в '
+                f'`{file_name}`.'
+            )
+            assert list(dumped[0])[:len(source[0])] == list(source[0]), (
+                f'Проверьте, что `dump_data` сохраняет колонки `{file_name}`.'
+            )
+        assert read_csv(os.path.join(dump_path, 'genre.csv')) == read_csv(
+            os.path.join(data_path, 'genre.csv')
+        )
+
+    def test_02_gzip_round_trip(self, data_path, tmp_path):
+        call_command('load_data', path=data_path, stdout=StringIO())
+        dump_path = str(tmp_path / 'dump')
+        call_command('dump_data', path=dump_path, gzip=True, stdout=StringIO())
+        with gzip.open(
+            os.path.join(dump_path, 'titles.csv.gz'), 'rt', encoding='utf-8'
+        ) as data_file:
+            assert next(csv.reader(data_file))[:3] == ['id', 'name', 'year']
+
+        counts = {
+            model: model.objects.count()
+            for model in (User, Title, Title.genre.through, Review, Comment)
+        }
+        call_command('flush', interactive=False, stdout=StringIO())
+        call_command('load_data', path=dump_path, stdout=StringIO())
+        for model, count in counts.items():
+            assert model.objects.count() == count, (
+                'Проверьте, что файлы `dump_data --gzip` загружаются '
+                'командой `load_data`.'
+            )
+        assert count_rows(data_path, 'titles.csv') == counts[Title]
+
+    def test_03_description_round_trip(self, data_path, tmp_path):
+        call_command('load_data', path=data_path, stdout=StringIO())
+        title = Title.objects.order_by('pk').first()
+        title.description = 'Описание, "с кавычками"\nи переносом'
+        title.save()
+        dump_path = str(tmp_path / 'dump')
+        call_command('dump_data', path=dump_path, stdout=StringIO())
+        call_command('flush', interactive=False, stdout=StringIO())
+        call_command('load_data', path=dump_path, stdout=StringIO())
+        assert Title.objects.get(pk=title.pk).description == (
+            title.description
+        ), (
+            'Проверьте, что `dump_data` выгружает описание произведения, '
+            'а `load_data` его загружает.'
+        )
+        assert Title.objects.count() == count_rows(data_path, 'titles.csv'), (
+            'Проверьте, что `load_data` загружает произведения '
+            'с пустым описанием.'
+        )
+
+    def test_04_path_required(self):
+        with pytest.raises(CommandError):
+            call_command('dump_data', stdout=StringIO())
+
+    def test_05_dates_round_trip(self, data_path, tmp_path):
+        call_command('load_data', path=data_path, stdout=StringIO())
+        for model, file_name in ((Review, 'review.csv'),
+                                 (Comment, 'comments.csv')):
+            source = {
+                int(row['id']): parse_datetime(row['pub_date'])
+                for row in read_csv(os.path.join(data_path, file_name))
+            }
+            assert dict(model.objects.values_list('pk', 'pub_date')) == (
+                source
+            ), (
+                f'Проверьте, что `load_data` сохраняет даты `pub_date` '
+                f'из файла `{file_name}`.'
+            )
+
+        dates = {
+            model: dict(model.objects.values_list('pk', 'pub_date'))
+            for model in (Review, Comment)
+        }
+        dump_path = str(tmp_path / 'dump')
+        call_command('dump_data', path=dump_path, stdout=StringIO())
+        call_command('flush', interactive=False, stdout=StringIO())
+        call_command('load_data', path=dump_path, stdout=StringIO())
+        for model, model_dates in dates.items():
+            assert dict(model.objects.values_list('pk', 'pub_date')) == (
+                model_dates
+            ), (
+                'Проверьте, что даты публикации сохраняются после выгрузки '
+                '`dump_data` и загрузки `load_data`.'
+            )
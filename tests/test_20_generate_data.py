@@ -0,0 +1,74 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+SIZES = {
+    'users': 30,
+    'categories': 3,
+    'genres': 5,
+    'titles': 20,
+    'reviews': 200,
+    'comments': 300,
+}
+
+
+def generate_data(**kwargs):
+    call_command(
+        'generate_data', stdout=StringIO(), **{**SIZES, **kwargs}
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20GenerateData:
+
+    def test_01_sizes_and_skew(self):
+        generate_data(seed=1)
+        expected = (
+            (User, 'users'),
+            (Category, 'categories'),
+            (Genre, 'genres'),
+            (Title, 'titles'),
+            (Review, 'reviews'),
+            (Comment, 'comments'),
+        )
+        for model, name in expected:
+            assert model.objects.count() == SIZES[name], (
+                f'Проверьте, что команда `generate_data` создает '
+                f'`--{name}` записей модели `{model.__name__}`.'
+            )
+        counts = sorted(
+            Title.objects.values_list('reviews_count', flat=True),
+            reverse=True,
+        )
+        assert sum(counts[:4]) > SIZES['reviews'] / 2, (
+            'Проверьте, что большая часть отзывов приходится на немногие '
+            'произведения.'
+        )
+        assert Title.objects.filter(rating__isnull=False).exists(), (
+            'Проверьте, что после генерации пересчитывается рейтинг.'
+        )
+
+    def test_02_reproducible(self):
+        def snapshot():
+            return list(
+                Review.objects.order_by('pk').values_list(
+                    'title_id', 'author_id', 'score', 'text'
+                )
+            )
+
+        generate_data(seed=7)
+        first = snapshot()
+        call_command('flush', interactive=False)
+        generate_data(seed=7)
+        assert snapshot() == first, (
+            'Проверьте, что команда `generate_data` с одинаковым `--seed` '
+            'создает одинаковые данные.'
+        )
+
+    def test_03_too_many_reviews(self):
+        with pytest.raises(CommandError):
+            generate_data(reviews=SIZES['users'] * SIZES['titles'] + 1)
@@ -0,0 +1,65 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.benchmark import compare, percentile, run_benchmark
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Benchmark:
+
+    def test_01_all_routes_succeed(self):
+        call_command(
+            'generate_data',
+            users=20,
+            titles=10,
+            reviews=60,
+            comments=60,
+            stdout=StringIO(),
+        )
+        results = run_benchmark(iterations=3, warmup=1)
+        for name in ('titles-list', 'reviews-list', 'comments-detail',
+                     'user-list', 'get_jwt_token', 'titles-bulk'):
+            assert name in results, (
+                f'Проверьте, что бенчмарк измеряет маршрут `{name}`.'
+            )
+        for name, result in results.items():
+            assert all(
+                code.startswith('2') for code in result['statuses']
+            ), (
+                f'Проверьте, что запросы сценария `{name}` бенчмарка '
+                f'выполняются успешно: {result["statuses"]}.'
+            )
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+            assert result['throughput_rps'] > 0
+        assert results['titles-detail']['queries_per_request'] > 0, (
+            'Проверьте, что бенчмарк считает SQL-запросы на запрос.'
+        )
+        for name in ('titles-list', 'titles-list-cursor', 'titles-search',
+                     'categories-list', 'genres-list', 'signup'):
+            assert results[name]['queries_per_request'] > 0, (
+                f'Проверьте, что сценарий `{name}` бенчмарка измеряет '
+                'запросы к базе данных, а не ответы из кэша.'
+            )
+
+    def test_02_compare_with_baseline(self):
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+        assert percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
+        baseline = {
+            'titles-list': {'p95_ms': 10.0, 'queries_per_request': 2},
+            'genres-list': {'p95_ms': 10.0, 'queries_per_request': 2},
+        }
+        results = {
+            'titles-list': {'p95_ms': 11.0, 'queries_per_request': 3},
+            'genres-list': {'p95_ms': 15.0, 'queries_per_request': 2},
+            'new-route': {'p95_ms': 1.0, 'queries_per_request': 1},
+        }
+        regressions = compare(results, baseline, threshold=20)
+        assert [(name, metric) for name, metric, *_ in regressions] == [
+            ('titles-list', 'queries_per_request'),
+            ('genres-list', 'p95_ms'),
+        ], (
+            'Проверьте, что сравнение с базовым прогоном находит рост p95 '
+            'сверх порога и рост числа SQL-запросов.'
+        )
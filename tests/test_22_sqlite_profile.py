@@ -0,0 +1,68 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+
+from reviews.management.commands.benchmark_sqlite import BENCHMARK_DATABASE
+from reviews.signals import configure_sqlite
+
+
+def get_pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22SqliteProfile:
+
+    def test_01_pragmas_applied_on_connect(self):
+        pragmas = {'synchronous': 'NORMAL', 'cache_size': -2048,
+                   'busy_timeout': 1234}
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            configure_sqlite(sender=None, connection=connection)
+        assert get_pragma('synchronous') == 1, (
+            'Проверьте, что при открытии соединения SQLite выполняются '
+            'PRAGMA из настройки `SQLITE_PRAGMAS`.'
+        )
+        assert get_pragma('cache_size') == -2048
+        assert get_pragma('busy_timeout') == 1234
+
+    def test_02_benchmark_command(self, tmp_path):
+        output = tmp_path / 'sqlite.json'
+        journal_modes = set()
+
+        def record_journal_mode(sender, connection, **kwargs):
+            if connection.alias == BENCHMARK_DATABASE:
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    journal_modes.add(cursor.fetchone()[0])
+
+        connection_created.connect(record_journal_mode)
+        try:
+            call_command(
+                'benchmark_sqlite',
+                duration=0.2,
+                readers=1,
+                writers=1,
+                titles=10,
+                output=str(output),
+                stdout=StringIO(),
+            )
+        finally:
+            connection_created.disconnect(record_journal_mode)
+        assert journal_modes == {'delete', 'wal'}, (
+            'Проверьте, что команда `benchmark_sqlite` открывает соединения '
+            'через `django.db.connections` с PRAGMA каждого профиля.'
+        )
+        results = json.loads(output.read_text())
+        assert set(results) == {'development', 'production'}, (
+            'Проверьте, что команда `benchmark_sqlite` сравнивает профили '
+            '`development` и `production`.'
+        )
+        for result in results.values():
+            assert result['writes_per_second'] > 0
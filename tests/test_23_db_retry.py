@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import OperationalError
+
+from api.cache import get_cache, increment_counter
+from api.metrics import get_metric_key, get_metrics
+from api.views import ReviewViewSet
+from reviews.models import Review
+from tests.utils import create_titles
+
+
+@pytest.fixture(autouse=True)
+def fast_retry(settings):
+    settings.DB_RETRY_DEADLINE = 0.5
+    settings.DB_RETRY_BASE_DELAY = 0.001
+    settings.DB_RETRY_MAX_DELAY = 0.01
+
+
+def lock_first_calls(monkeypatch, calls):
+    """Первые `calls` вызовов perform_create падают с блокировкой базы."""
+    original = ReviewViewSet.perform_create
+    state = {'calls': 0}
+
+    def perform_create(self, serializer):
+        original(self, serializer)
+        state['calls'] += 1
+        if calls is None or state['calls'] <= calls:
+            raise OperationalError('database is locked')
+
+    monkeypatch.setattr(ReviewViewSet, 'perform_create', perform_create)
+    return state
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23DbRetry:
+
+    def test_01_write_retried_after_lock(self, admin_client, monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        state = lock_first_calls(monkeypatch, 2)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = admin_client.post(url, data={'text': 'Текст', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что при ошибке `database is locked` запись отзыва '
+            'повторяется и запрос завершается успешно.'
+        )
+        assert state['calls'] == 3
+        assert Review.objects.count() == 1, (
+            'Проверьте, что неудачные попытки записи откатываются.'
+        )
+
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == HTTPStatus.OK
+        metrics = response.json()
+        assert metrics.get('db_retry.retries.ReviewViewSet.create') == 2, (
+            'Проверьте, что эндпоинт `/api/v1/metrics/` возвращает число '
+            'повторов записи.'
+        )
+        assert metrics.get('db_retry.recovered.ReviewViewSet.create') == 1
+
+    def test_02_deadline_exceeded(self, admin_client, monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        lock_first_calls(monkeypatch, None)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = admin_client.post(url, data={'text': 'Текст', 'score': 5})
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE, (
+            'Проверьте, что после исчерпания попыток записи возвращается '
+            'ответ со статусом 503.'
+        )
+        assert int(response['Retry-After']) >= 1, (
+            'Проверьте, что ответ 503 содержит заголовок `Retry-After`.'
+        )
+        assert Review.objects.count() == 0
+        metrics = admin_client.get('/api/v1/metrics/').json()
+        assert metrics.get('db_retry.exhausted.ReviewViewSet.create') == 1, (
+            'Проверьте, что исчерпание попыток записи учитывается в метриках.'
+        )
+
+    def test_03_metrics_admin_only(self, user_client, client):
+        for current_client in (user_client, client):
+            response = current_client.get('/api/v1/metrics/')
+            assert response.status_code in (
+                HTTPStatus.FORBIDDEN, HTTPStatus.UNAUTHORIZED
+            ), (
+                'Проверьте, что метрики доступны только администратору.'
+            )
+
+    def test_04_metrics_of_other_processes_reported(self):
+        name = 'db_retry.retries.TitleCreateViewsSet.partial_update'
+        increment_counter(get_metric_key(name), 3)
+        assert get_metrics().get(name) == 3, (
+            'Проверьте, что метрика попадает в отчет, даже если ее счетчик '
+            'создан другим процессом.'
+        )
+        get_cache().delete(get_metric_key(name))
+        assert name not in get_metrics()
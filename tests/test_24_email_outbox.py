@@ -0,0 +1,279 @@
+import threading
+import time
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+from smtplib import SMTPException
+from threading import Event
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import OperationalError
+from django.utils import timezone
+
+from users import outbox
+from users.models import OutboxEmail
+
+
+@pytest.fixture
+def worker_delivery(settings):
+    settings.EMAIL_OUTBOX_DELIVERY = 'worker'
+
+
+@pytest.fixture
+def drainer():
+    yield outbox.drainer
+    outbox.drainer.stop(timeout=5)
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def enqueue(count):
+    for number in range(count):
+        outbox.enqueue_email(
+            'Тема', 'Текст', 'yamdb_service@ya.ru', f'user{number}@yamdb.fake'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24EmailOutbox:
+
+    def test_01_signup_enqueues_email(self, client, worker_delivery):
+        outbox_before_count = len(mail.outbox)
+        response = client.post('/api/v1/auth/signup/', data={
+            'email': 'valid@yamdb.fake',
+            'username': 'valid_username',
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что в режиме доставки `worker` запрос к '
+            '`/api/v1/auth/signup/` не отправляет письмо сам.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == 'valid@yamdb.fake' and email.sent_at is None
+
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что команда `send_outbox` отправляет письма '
+            'из очереди.'
+        )
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 1
+
+    def test_02_batches_share_connection(self, worker_delivery, monkeypatch):
+        enqueue(5)
+        opened = []
+        get_connection = outbox.get_connection
+
+        def counting_get_connection(*args, **kwargs):
+            opened.append(1)
+            return get_connection(*args, **kwargs)
+
+        monkeypatch.setattr(outbox, 'get_connection', counting_get_connection)
+        assert outbox.drain_outbox(batch_size=2) == (5, 0)
+        assert len(opened) == 1, (
+            'Проверьте, что все пакеты писем отправляются через одно '
+            'соединение почтового бэкенда.'
+        )
+
+    def test_03_failed_email_retried_later(self, worker_delivery,
+                                           monkeypatch):
+        enqueue(1)
+
+        def fail(self):
+            raise SMTPException('Сервер недоступен')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(outbox.EmailMessage, 'send', fail)
+            assert outbox.drain_outbox(batch_size=10) == (0, 1)
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 1 and email.sent_at is None
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что неудачная отправка откладывается на потом.'
+        )
+        assert 'Сервер недоступен' in email.last_error
+        assert outbox.drain_outbox(batch_size=10) == (0, 0)
+
+        email.next_attempt_at = timezone.now() - timedelta(seconds=1)
+        email.save()
+        assert outbox.drain_outbox(batch_size=10) == (1, 0), (
+            'Проверьте, что отложенное письмо отправляется повторно.'
+        )
+
+    def test_04_claimed_email_sent_once(self, worker_delivery):
+        enqueue(3)
+        emails = outbox.claim_emails(
+            OutboxEmail.objects.values_list('pk', flat=True)[:2]
+        )
+        assert [email.pk for email in emails] == list(
+            OutboxEmail.objects.values_list('pk', flat=True)[:2]
+        )
+        assert outbox.claim_emails([email.pk for email in emails]) == [], (
+            'Проверьте, что захваченное письмо не достается другому '
+            'отправителю.'
+        )
+        outbox_before_count = len(mail.outbox)
+        assert outbox.drain_outbox(batch_size=10) == (1, 0), (
+            'Проверьте, что `send_outbox` пропускает письма, захваченные '
+            'другим отправителем.'
+        )
+        assert outbox.send_emails(emails) == (2, 0)
+        assert len(mail.outbox) == outbox_before_count + 3
+        assert outbox.drain_outbox(batch_size=10) == (0, 0)
+
+    def test_05_stale_claim_released(self, worker_delivery, settings):
+        enqueue(1)
+        outbox.claim_emails(OutboxEmail.objects.values_list('pk', flat=True))
+        assert outbox.drain_outbox(batch_size=10) == (0, 0)
+        settings.EMAIL_OUTBOX_LOCK_TIMEOUT = 0
+        assert outbox.drain_outbox(batch_size=10) == (1, 0), (
+            'Проверьте, что письмо, захваченное слишком давно, '
+            'отправляется повторно.'
+        )
+
+    def test_06_thread_delivery(self, client, settings, monkeypatch,
+                                drainer):
+        settings.EMAIL_OUTBOX_DELIVERY = 'thread'
+        settings.EMAIL_OUTBOX_POLL_INTERVAL = 0.05
+        release = Event()
+        connections = []
+        drain_outbox = outbox.drain_outbox
+        get_connection = outbox.get_connection
+
+        def blocking_drain(batch_size):
+            assert release.wait(timeout=5)
+            return drain_outbox(batch_size)
+
+        def tracking_connection(*args, **kwargs):
+            connections.append(get_connection(*args, **kwargs))
+            return connections[-1]
+
+        monkeypatch.setattr(outbox, 'drain_outbox', blocking_drain)
+        monkeypatch.setattr(outbox, 'get_connection', tracking_connection)
+        outbox_before_count = len(mail.outbox)
+        for number in range(3):
+            response = client.post('/api/v1/auth/signup/', data={
+                'email': f'valid{number}@yamdb.fake',
+                'username': f'valid_username{number}',
+            })
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что в режиме доставки `thread` ответ на запрос '
+                'не ждет почтовый сервер.'
+            )
+        assert len(mail.outbox) == outbox_before_count
+        assert [
+            thread for thread in threading.enumerate()
+            if thread.name == 'outbox-drainer'
+        ] == [drainer.thread], (
+            'Проверьте, что в режиме доставки `thread` письма отправляет '
+            'один фоновый поток процесса, а не поток на каждое письмо.'
+        )
+        release.set()
+        assert wait_until(
+            lambda: len(mail.outbox) == outbox_before_count + 3
+        )
+        drainer.stop(timeout=5)
+        assert len(connections) == 1, (
+            'Проверьте, что фоновый поток отправляет очередь пакетами '
+            'через одно соединение с почтовым сервером.'
+        )
+        assert not OutboxEmail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_07_thread_retries_failed_email(self, settings, monkeypatch,
+                                            drainer):
+        settings.EMAIL_OUTBOX_DELIVERY = 'thread'
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 0
+        settings.EMAIL_OUTBOX_POLL_INTERVAL = 0.05
+        send = outbox.EmailMessage.send
+        failures = [SMTPException('Сервер недоступен')]
+
+        def flaky_send(self, *args, **kwargs):
+            if failures:
+                raise failures.pop()
+            return send(self, *args, **kwargs)
+
+        monkeypatch.setattr(outbox.EmailMessage, 'send', flaky_send)
+        outbox_before_count = len(mail.outbox)
+        enqueue(1)
+        assert wait_until(
+            lambda: len(mail.outbox) == outbox_before_count + 1
+        ), (
+            'Проверьте, что фоновый поток повторяет неудачные попытки '
+            'без команды `send_outbox`.'
+        )
+        drainer.stop(timeout=5)
+        assert OutboxEmail.objects.get().attempts == 2
+
+    def test_08_any_send_error_recorded(self, worker_delivery, monkeypatch):
+        enqueue(2)
+
+        def fail(self):
+            raise RuntimeError('Неожиданная ошибка')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(outbox.EmailMessage, 'send', fail)
+            assert outbox.drain_outbox(batch_size=10) == (0, 2), (
+                'Проверьте, что любая ошибка отправки письма учитывается '
+                'как неудачная попытка, а не прерывает отправку очереди.'
+            )
+        for email in OutboxEmail.objects.all():
+            assert email.attempts == 1 and email.sent_at is None
+            assert 'Неожиданная ошибка' in email.last_error
+            assert email.locked_at is None and email.lock_token == '', (
+                'Проверьте, что после неудачной попытки захват с письма '
+                'снимается.'
+            )
+
+    def test_09_worker_survives_claim_error(self, worker_delivery,
+                                            monkeypatch):
+        enqueue(1)
+
+        def locked(email_ids):
+            raise OperationalError('database is locked')
+
+        monkeypatch.setattr(outbox, 'claim_emails', locked)
+        out = StringIO()
+        call_command('send_outbox', stdout=out)
+        assert 'database is locked' in out.getvalue(), (
+            'Проверьте, что команда `send_outbox` сообщает об ошибке '
+            'и не завершается с исключением.'
+        )
+
+    def test_10_thread_error_logged(self, worker_delivery, monkeypatch,
+                                    caplog):
+        enqueue(1)
+
+        def locked(email_ids):
+            raise OperationalError('database is locked')
+
+        monkeypatch.setattr(outbox, 'claim_emails', locked)
+        outbox.OutboxDrainer().drain()
+        assert any(
+            record.name == 'users.outbox' and record.exc_info
+            for record in caplog.records
+        ), (
+            'Проверьте, что ошибка фонового потока отправки писем '
+            'записывается в журнал.'
+        )
+
+    def test_11_failed_batch_released(self, worker_delivery, monkeypatch):
+        enqueue(1)
+
+        def broken(emails, connection):
+            raise OperationalError('database is locked')
+
+        monkeypatch.setattr(outbox, 'send_batch', broken)
+        with pytest.raises(OperationalError):
+            outbox.drain_outbox(batch_size=10)
+        assert OutboxEmail.objects.get().locked_at is None, (
+            'Проверьте, что при ошибке записи результата пакета захват '
+            'с писем снимается.'
+        )
@@ -0,0 +1,89 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+from api.authentication import LRUCache
+from users.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25UserCache:
+
+    def test_01_cached_user_without_queries(self, user_client,
+                                            django_assert_num_queries):
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.json()['username'] == 'TestUser', (
+            'Проверьте, что повторный аутентифицированный GET-запрос '
+            'получает пользователя из кэша без запросов к базе данных.'
+        )
+
+    def test_02_role_change_invalidates(self, admin_client, user_client,
+                                        user):
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что после изменения роли пользователя кэш '
+            'аутентификации сбрасывается.'
+        )
+
+    def test_03_profile_change_and_delete(self, admin_client, user_client,
+                                          user):
+        user_client.get('/api/v1/users/me/')
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'bio': 'Новое описание'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.get('/api/v1/users/me/')
+        assert response.json()['bio'] == 'Новое описание', (
+            'Проверьте, что изменение профиля через `/api/v1/users/me/` '
+            'сбрасывает кэш аутентификации.'
+        )
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удаленного пользователя не принимается.'
+        )
+
+    def test_04_queryset_update_invalidates(self, user_client, user):
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что отключение пользователя через '
+            '`QuerySet.update(is_active=False)` сбрасывает кэш '
+            'аутентификации.'
+        )
+
+    def test_05_lru_and_ttl(self):
+        cache = LRUCache(max_size=2, timeout=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert cache.get('b') is None, (
+            'Проверьте, что из кэша вытесняется давно не использованная '
+            'запись.'
+        )
+        assert cache.get('a') == 1 and cache.get('c') == 3
+
+        cache = LRUCache(max_size=2, timeout=0)
+        cache.set('a', 1)
+        time.sleep(0.001)
+        assert cache.get('a') is None, (
+            'Проверьте, что записи кэша устаревают.'
+        )
@@ -0,0 +1,168 @@
+import runpy
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.checks import check_shared_cache
+from api_yamdb import settings as settings_module
+from tests.utils import create_titles
+from users.models import User
+
+
+def get_token_client(client, user):
+    response = client.post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == HTTPStatus.OK
+    token = response.json()['token']
+    token_client = APIClient()
+    token_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return token_client, AccessToken(token)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TokenClaims:
+
+    def test_01_token_contains_claims(self, client, admin):
+        _, token = get_token_client(client, admin)
+        assert token['role'] == 'admin', (
+            'Проверьте, что токен содержит роль пользователя.'
+        )
+        assert token['is_staff'] is False and token['is_superuser'] is False
+        assert token['token_version'] == admin.token_version
+
+    def test_02_permissions_without_queries(self, client, admin,
+                                            django_assert_num_queries):
+        admin_client, _ = get_token_client(client, admin)
+        assert admin_client.get('/api/v1/metrics/').status_code == (
+            HTTPStatus.OK
+        )
+        with django_assert_num_queries(0):
+            response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что права администратора проверяются по токену '
+            'без запросов к базе данных.'
+        )
+
+    def test_03_stale_role_rejected(self, client, admin_client, user):
+        user_client, _ = get_token_client(client, user)
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
+
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'bio': 'Новое описание'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что изменение профиля без смены роли не делает '
+            'токен недействительным.'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после смены роли токен с прежней ролью '
+            'отклоняется.'
+        )
+
+        user.refresh_from_db()
+        moderator_client, token = get_token_client(client, user)
+        assert token['role'] == 'moderator'
+        assert moderator_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
+
+    def test_04_author_writes_with_claims_token(self, client, admin_client,
+                                                user):
+        titles, _, _ = create_titles(admin_client)
+        user_client, _ = get_token_client(client, user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(url, data={'text': 'Текст', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что пользователь с токеном, содержащим роль, '
+            'может создать отзыв.'
+        )
+        assert response.json()['author'] == user.username
+        response = user_client.patch(
+            f'{url}{response.json()["id"]}/', data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор может изменить свой отзыв.'
+        )
+
+    def test_05_concurrent_saves_keep_bumps(self, user):
+        first = User.objects.get(pk=user.pk)
+        second = User.objects.get(pk=user.pk)
+        first.role = User.UserRoles.MODERATOR
+        first.save()
+        second.is_staff = True
+        second.save(update_fields=('is_staff', ))
+        user.refresh_from_db()
+        assert user.token_version == 2, (
+            'Проверьте, что версия токенов увеличивается на стороне базы '
+            'данных и одновременные сохранения не теряют увеличений.'
+        )
+        assert second.token_version == 2
+
+    def test_06_queryset_updates_bump_version(self, client, user, moderator):
+        user_client, _ = get_token_client(client, user)
+        User.objects.filter(pk=user.pk).update(role=User.UserRoles.ADMIN)
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что смена роли через `update()` делает токен '
+            'недействительным.'
+        )
+
+        user.refresh_from_db()
+        moderator.refresh_from_db()
+        version = user.token_version
+        user_client, _ = get_token_client(client, user)
+        moderator_client, _ = get_token_client(client, moderator)
+        user.role = User.UserRoles.USER
+        moderator.bio = 'Новое описание'
+        User.objects.bulk_update([user, moderator], ['role', 'bio'])
+        user.refresh_from_db()
+        moderator.refresh_from_db()
+        assert user.token_version == version + 1, (
+            'Проверьте, что смена роли через `bulk_update()` увеличивает '
+            'версию токенов.'
+        )
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        assert moderator_client.get('/api/v1/users/me/').json()['bio'] == (
+            'Новое описание'
+        ), (
+            'Проверьте, что `bulk_update()` сбрасывает кэш пользователей и '
+            'не отзывает токены без смены прав.'
+        )
+
+    def test_07_production_requires_shared_cache(self, settings,
+                                                 monkeypatch):
+        assert check_shared_cache(None) == []
+        settings.DATABASE_PROFILE = 'production'
+        assert [error.id for error in check_shared_cache(None)] == [
+            'api.E001'
+        ], (
+            'Проверьте, что в профиле production кэш процесса '
+            'считается ошибкой конфигурации.'
+        )
+
+        monkeypatch.setenv('DJANGO_DATABASE_PROFILE', 'production')
+        production = runpy.run_path(settings_module.__file__)
+        backend = production['CACHES'][production['RESPONSE_CACHE_ALIAS']]
+        assert backend['BACKEND'] not in settings.LOCAL_CACHE_BACKENDS, (
+            'Проверьте, что профиль production настраивает общий для '
+            'процессов кэш.'
+        )
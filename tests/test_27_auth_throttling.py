@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+
+from api import throttling
+from api.metrics import get_metrics
+
+URL = '/api/v1/auth/signup/'
+
+
+@pytest.fixture
+def auth_rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': rates,
+        }
+    return set_rates
+
+
+def signup(client, number, **extra):
+    return client.post(URL, data={
+        'username': f'user{number}',
+        'email': f'user{number}@yamdb.fake',
+    }, **extra)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27AuthThrottling:
+
+    def test_01_username_bucket(self, client, auth_rates):
+        auth_rates(auth_username='2/min')
+        for _ in range(2):
+            assert signup(client, 1).status_code == HTTPStatus.OK
+        response = signup(client, 1)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частые запросы к `{URL}` с одним username '
+            'ограничиваются.'
+        )
+        assert int(response['Retry-After']) > 0, (
+            'Проверьте, что ответ 429 содержит заголовок `Retry-After`.'
+        )
+        assert signup(client, 2).status_code == HTTPStatus.OK
+        assert get_metrics().get('throttle.rejected.auth_username') == 1, (
+            'Проверьте, что отклоненные запросы учитываются в метриках.'
+        )
+
+    def test_02_ip_bucket(self, client, auth_rates):
+        auth_rates(auth_ip='3/min')
+        for number in range(3):
+            assert signup(client, number).status_code == HTTPStatus.OK
+        assert signup(client, 3).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        ), (
+            f'Проверьте, что частые запросы к `{URL}` с одного IP-адреса '
+            'ограничиваются.'
+        )
+        response = signup(client, 3, REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == HTTPStatus.OK
+
+        response = client.post('/api/v1/auth/token/', data={
+            'username': 'user0', 'confirmation_code': 'wrong',
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что запросы к `/api/v1/auth/token/` ограничиваются '
+            'той же корзиной IP-адреса.'
+        )
+
+    def test_03_bucket_refills(self, client, auth_rates, monkeypatch):
+        auth_rates(auth_username='1/min')
+        now = [1000.0]
+        monkeypatch.setattr(throttling.time, 'time', lambda: now[0])
+        assert signup(client, 1).status_code == HTTPStatus.OK
+        assert signup(client, 1).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+        now[0] += 60
+        assert signup(client, 1).status_code == HTTPStatus.OK, (
+            'Проверьте, что корзина пополняется со временем.'
+        )
+
+    def test_04_forwarded_for_ignored(self, client, auth_rates):
+        auth_rates(auth_ip='3/min')
+        statuses = [
+            signup(
+                client, number, HTTP_X_FORWARDED_FOR=f'203.0.113.{number}'
+            ).status_code
+            for number in range(5)
+        ]
+        assert statuses.count(HTTPStatus.TOO_MANY_REQUESTS) == 2, (
+            'Проверьте, что ограничение по IP-адресу нельзя обойти, меняя '
+            'заголовок `X-Forwarded-For` в каждом запросе.'
+        )
+
+    def test_05_trusted_proxy(self, client, auth_rates, settings):
+        auth_rates(auth_ip='1/min')
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+        response = signup(
+            client, 1, HTTP_X_FORWARDED_FOR='203.0.113.1, 198.51.100.7'
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = signup(
+            client, 2, HTTP_X_FORWARDED_FOR='203.0.113.2, 198.51.100.7'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что за доверенным прокси адрес клиента берется '
+            'из части `X-Forwarded-For`, добавленной прокси.'
+        )
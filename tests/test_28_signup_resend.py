@@ -0,0 +1,43 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+
+from users.models import OutboxEmail
+
+URL = '/api/v1/auth/signup/'
+DATA = {'username': 'valid_username', 'email': 'valid@yamdb.fake'}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28SignupResend:
+
+    def test_01_repeat_within_window(self, client,
+                                     django_assert_num_queries):
+        outbox_before_count = len(mail.outbox)
+        assert client.post(URL, data=DATA).status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            response = client.post(URL, data=DATA)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == DATA
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            f'Проверьте, что повторный запрос к `{URL}` в пределах окна '
+            '`SIGNUP_RESEND_WINDOW` не отправляет новый код.'
+        )
+        assert OutboxEmail.objects.count() == 1
+
+        response = client.post(URL, data={**DATA, 'email': 'other@yamdb.fake'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что окно повторной отправки не отменяет проверку '
+            'соответствия username и email.'
+        )
+
+    def test_02_window_disabled(self, client, settings):
+        settings.SIGNUP_RESEND_WINDOW = 0
+        outbox_before_count = len(mail.outbox)
+        for _ in range(2):
+            assert client.post(URL, data=DATA).status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count + 2, (
+            'Проверьте, что при `SIGNUP_RESEND_WINDOW = 0` код отправляется '
+            'при каждом запросе.'
+        )
@@ -1,4 +1,11 @@
 from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from api.middleware import get_query_budget
 
 
 check_name_and_slug_patterns = (
@@ -305,3 +312,21 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def check_query_budget(client, url, budget=None):
+    url_name = resolve(urlsplit(url).path).url_name
+    if budget is None:
+        budget = get_query_budget(url_name)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    queries = '\n'.join(query['sql'] for query in context.captured_queries)
+    assert len(context) <= budget, (
+        f'GET-запрос к `{url}` (`{url_name}`) выполнил {len(context)} '
+        f'SQL-запросов при бюджете {budget}:\n{queries}'
+    )
+    return response